@@ -0,0 +1,399 @@
+"""Headless JSON HTTP API for SmartLearningAssistant.
+
+    python api.py --port 8080 --data-dir student_data --flush-interval 1
+
+Plain asyncio streams, no web framework. Students are served from one
+StudentStore with deferred writes: requests change the cached assistant
+in memory and a background task persists every changed student once per
+flush interval, so a burst of session logs costs one write per student
+rather than one per request. Assistant calls run in a thread pool, which
+keeps a slow flush or a cold load off the event loop.
+
+Routes (student names URL-encoded; {kind} is assignments, works or projects):
+
+    GET    /health
+    POST   /flush
+    GET    /students/{name}/analytics | dashboard | suggestions | urgent
+    GET    /students/{name}/{kind}?subject=&status=&start_date=&end_date=&sort_by=&descending=&limit=&offset=
+    GET    /students/{name}/{kind}/{id}
+    PATCH  /students/{name}/{kind}/{id}                  fields to change
+    DELETE /students/{name}/{kind}/{id}
+    POST   /students/{name}/assignments                  {title, subject, deadline_days, difficulty}
+    POST   /students/{name}/assignments/{id}/complete    {score}
+    POST   /students/{name}/works                        {title, subject, duration_hours, completed}
+    POST   /students/{name}/projects                     {title, description, deadline_days, status}
+    GET    /students/{name}/sessions?...&history=        same filters as {kind}
+    POST   /students/{name}/sessions                     {subject, duration_hours, topics_covered}
+    GET    /students/{name}/sessions/search?q=&subject=&limit=&offset=&history=
+    POST   /students/{name}/sessions/archive             {days}
+    GET    /students/{name}/timetable
+    POST   /students/{name}/timetable                    {day, time, subject, duration, allow_overlap}
+    DELETE /students/{name}/timetable/{day}/{time}
+    GET    /students/{name}/timetable/free?day=&min_hours=
+    GET    /students/{name}/timetable/next
+    POST   /students/{name}/timetable/schedule           {apply}
+    GET    /students/{name}/reviews?limit=
+    POST   /students/{name}/reviews                      {subject, topic, quality}
+
+Mutations answer {"message": ...} like the assistant methods do.
+"""
+import argparse
+import asyncio
+import json
+import math
+import re
+import sys
+from datetime import date
+from functools import partial
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from backend import StudentStore
+
+# Seconds between two persists of the buffered writes
+FLUSH_INTERVAL = 1.0
+
+# Largest request body accepted
+MAX_BODY_BYTES = 1024 * 1024
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+STUDENT = r'/students/(?P<student>[^/]+)'
+KIND = r'(?P<kind>assignments|works|projects)'
+
+# (method, compiled path pattern, handler); handlers get (assistant, query, body, **path groups)
+ROUTES = []
+
+# Types of the JSON body fields the mutators take, checked before one runs:
+# a wrong type would otherwise fail halfway through and leave half a change
+NUMBER = ((int, float), "a number")
+INTEGER = (int, "an integer")
+TEXT = (str, "a string")
+FLAG = (bool, "true or false")
+BODY_TYPES = {
+    'title': TEXT, 'subject': TEXT, 'description': TEXT, 'difficulty': TEXT, 'status': TEXT,
+    'topics_covered': TEXT, 'topic': TEXT, 'day': TEXT, 'time': TEXT,
+    'deadline_days': NUMBER, 'duration_hours': NUMBER, 'duration': NUMBER, 'score': NUMBER,
+    'quality': NUMBER, 'days': INTEGER, 'min_sessions': INTEGER, 'limit': INTEGER,
+    'completed': FLAG, 'allow_overlap': FLAG, 'apply': FLAG,
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def route(method, pattern):
+    def register(func):
+        ROUTES.append((method, re.compile(f"^{STUDENT}{pattern}$"), func))
+        return func
+    return register
+
+
+def _arg(query, name, convert=str, default=None):
+    """One query string argument, converted; 400 when it does not parse"""
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        return convert(values[0])
+    except ValueError:
+        raise HTTPError(400, f"Invalid {name}: {values[0]!r}")
+
+
+def _flag(text):
+    return text.lower() in ('1', 'true', 'yes')
+
+
+def _message(result, status=200, ok=None):
+    """Mutator result strings: lookups that found nothing are a 404, and when the
+    success message starts with `ok`, any other message is a rejected request"""
+    if result.endswith("not found") or result.startswith("No entry"):
+        raise HTTPError(404, result)
+    if ok is not None and not result.startswith(ok):
+        raise HTTPError(409 if result.startswith("Overlaps") else 400, result)
+    return status, {'message': result}
+
+
+def _call(method, body, check=True):
+    """Call an assistant method with the JSON body as keyword arguments, after
+    checking them against BODY_TYPES (unless the method checks its own)"""
+    if not isinstance(body, dict):
+        raise HTTPError(400, "Expected a JSON object")
+    for name, value in body.items() if check else ():
+        if name not in BODY_TYPES:
+            raise HTTPError(400, f"Unexpected field: {name}")
+        types, expected = BODY_TYPES[name]
+        if (not isinstance(value, types) or (isinstance(value, bool) and types is not bool)
+                or (isinstance(value, float) and not math.isfinite(value))):
+            raise HTTPError(400, f"{name} must be {expected}")
+    try:
+        return method(**body)
+    except TypeError as e:
+        raise HTTPError(400, str(e))
+
+
+@route('GET', r'/analytics')
+def analytics(assistant, query, body):
+    return assistant.get_study_analytics()
+
+
+@route('GET', r'/dashboard')
+def dashboard(assistant, query, body):
+    return assistant.get_dashboard_summary()
+
+
+@route('GET', r'/suggestions')
+def suggestions(assistant, query, body):
+    return assistant.get_ai_suggestions()
+
+
+@route('GET', r'/urgent')
+def urgent(assistant, query, body):
+    return assistant.get_urgent_work(_arg(query, 'n', int, 5))
+
+
+@route('GET', r'/(?P<kind>assignments|works|projects|sessions)')
+def list_records(assistant, query, body, kind):
+    return assistant.query_records(
+        'study_log' if kind == 'sessions' else kind,
+        subject=_arg(query, 'subject'),
+        status=_arg(query, 'status'),
+        start_date=_arg(query, 'start_date', date.fromisoformat),
+        end_date=_arg(query, 'end_date', date.fromisoformat),
+        sort_by=_arg(query, 'sort_by'),
+        descending=_arg(query, 'descending', _flag, False),
+        limit=_arg(query, 'limit', int, 50),
+        offset=_arg(query, 'offset', int, 0),
+        history=_arg(query, 'history', _flag, False),
+    )
+
+
+@route('GET', rf'/{KIND}/(?P<record_id>\d+)')
+def get_record(assistant, query, body, kind, record_id):
+    record = assistant.get_record(kind, int(record_id))
+    if record is None:
+        raise HTTPError(404, f"{kind[:-1].capitalize()} not found")
+    return record
+
+
+@route('PATCH', rf'/{KIND}/(?P<record_id>\d+)')
+def update_record(assistant, query, body, kind, record_id):
+    # update_record checks field types and values itself
+    return _message(_call(partial(assistant.update_record, kind, int(record_id)), body, check=False))
+
+
+@route('DELETE', rf'/{KIND}/(?P<record_id>\d+)')
+def delete_record(assistant, query, body, kind, record_id):
+    return _message(assistant.delete_record(kind, int(record_id)))
+
+
+@route('POST', r'/assignments')
+def add_assignment(assistant, query, body):
+    return _message(_call(assistant.add_assignment, body), 201)
+
+
+@route('POST', r'/assignments/(?P<record_id>\d+)/complete')
+def complete_assignment(assistant, query, body, record_id):
+    return _message(_call(partial(assistant.complete_assignment, int(record_id)), body))
+
+
+@route('POST', r'/works')
+def add_work(assistant, query, body):
+    return _message(_call(assistant.add_work, body), 201)
+
+
+@route('POST', r'/projects')
+def add_project(assistant, query, body):
+    return _message(_call(assistant.add_project, body), 201)
+
+
+@route('POST', r'/sessions')
+def log_session(assistant, query, body):
+    return _message(_call(assistant.log_study_session, body), 201)
+
+
+@route('GET', r'/sessions/search')
+def search_sessions(assistant, query, body):
+    return assistant.search_sessions(_arg(query, 'q', default=''), _arg(query, 'subject'),
+                                     _arg(query, 'limit', int, 50), _arg(query, 'offset', int, 0),
+                                     _arg(query, 'history', _flag, False))
+
+
+@route('POST', r'/sessions/archive')
+def archive_sessions(assistant, query, body):
+    return _message(_call(assistant.archive_sessions, body))
+
+
+@route('GET', r'/timetable')
+def timetable(assistant, query, body):
+    return assistant.get_timetable()
+
+
+@route('POST', r'/timetable')
+def add_timetable_entry(assistant, query, body):
+    return _message(_call(assistant.add_timetable_entry, body), 201, ok="Timetable updated")
+
+
+@route('DELETE', r'/timetable/(?P<day>[^/]+)/(?P<time>[^/]+)')
+def remove_timetable_entry(assistant, query, body, day, time):
+    return _message(assistant.remove_timetable_entry(unquote(day), unquote(time)))
+
+
+@route('GET', r'/timetable/free')
+def free_slots(assistant, query, body):
+    return assistant.get_free_slots(_arg(query, 'day', default="Monday"), _arg(query, 'min_hours', float, 1.0))
+
+
+@route('GET', r'/timetable/next')
+def next_entry(assistant, query, body):
+    return assistant.get_next_entry()
+
+
+@route('POST', r'/timetable/schedule')
+def schedule(assistant, query, body):
+    return _call(assistant.schedule_assignments, body)
+
+
+@route('GET', r'/reviews')
+def due_reviews(assistant, query, body):
+    return assistant.get_due_reviews(_arg(query, 'limit', int, 10))
+
+
+@route('POST', r'/reviews')
+def review_topic(assistant, query, body):
+    return _message(_call(assistant.review_topic, body), ok="Review of")
+
+
+class APIServer:
+    """Routes requests to a StudentStore of deferred-write assistants"""
+
+    def __init__(self, store, flush_interval=FLUSH_INTERVAL):
+        self.store = store
+        self.flush_interval = flush_interval
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, partial(func, *args))
+
+    async def dispatch(self, method, target, body):
+        """(status, payload) of one request"""
+        url = urlsplit(target)
+        if url.path == '/health':
+            return 200, {'status': 'ok', 'cached_students': len(self.store.cache)}
+        if url.path == '/flush':
+            if method != 'POST':
+                raise HTTPError(405, "Use POST")
+            return 200, {'flushed_records': await self._run(self.store.flush_all)}
+        allowed = False
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.match(url.path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            groups = match.groupdict()
+            assistant = await self._run(self.store.get, unquote(groups.pop('student')))
+            result = await self._run(partial(handler, assistant, parse_qs(url.query), body, **groups))
+            return result if isinstance(result, tuple) else (200, result)
+        if allowed:
+            raise HTTPError(405, f"{method} not allowed on {url.path}")
+        raise HTTPError(404, f"No route for {url.path}")
+
+    async def handle(self, reader, writer):
+        """Serve the requests of one (keep-alive) connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split(maxsplit=2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (version.strip() == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                status, payload = await self._respond(method, target, headers, reader)
+                data = json.dumps(payload, default=str).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # client went away or sent garbage; drop the connection
+        finally:
+            writer.close()
+
+    async def _respond(self, method, target, headers, reader):
+        length = int(headers.get('content-length') or 0)
+        if length > MAX_BODY_BYTES:
+            await reader.readexactly(length)
+            return 413, {'error': "Request body too large"}
+        raw = await reader.readexactly(length) if length else b''
+        try:
+            body = json.loads(raw) if raw else {}
+            return await self.dispatch(method, target, body)
+        except HTTPError as e:
+            return e.status, {'error': str(e)}
+        except ValueError as e:  # bad JSON, dates or field values
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+
+    async def flush_loop(self):
+        """Persist buffered writes every flush_interval seconds"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self._run(self.store.flush_all)
+            except Exception as e:  # keep flushing; failed writes stay buffered for the next round
+                print(f"flush failed: {type(e).__name__}: {e}", file=sys.stderr)
+
+    async def serve(self, host="127.0.0.1", port=8080, ready=None):
+        """Serve until cancelled, then write whatever is still buffered"""
+        server = await asyncio.start_server(self.handle, host, port)
+        flusher = asyncio.create_task(self.flush_loop())
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flusher.cancel()
+            await self._run(self.store.flush_all)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--data-dir', default="student_data")
+    parser.add_argument('--storage', default="json", choices=["json", "journal", "sqlite"])
+    parser.add_argument('--flush-interval', type=float, default=FLUSH_INTERVAL)
+    parser.add_argument('--archive-days', type=int,
+                        help="archive each student's sessions older than this many days on load")
+    args = parser.parse_args(argv)
+    if args.flush_interval <= 0:
+        parser.error("--flush-interval must be positive")
+
+    store = StudentStore(args.data_dir, args.storage, defer_writes=True, archive_days=args.archive_days)
+    print(f"Serving on http://{args.host}:{args.port} (flushing every {args.flush_interval}s)")
+    try:
+        asyncio.run(APIServer(store, args.flush_interval).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,292 +1,561 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from backend import SmartLearningAssistant
-from datetime import datetime
-
-# Page config
-st.set_page_config(page_title="Smart Learning AI Assistant", layout="wide", initial_sidebar_state="expanded")
-
-# Initialize session state
-if 'assistant' not in st.session_state:
-    st.session_state.assistant = SmartLearningAssistant("Student")
-
-assistant = st.session_state.assistant
-
-# Sidebar
-with st.sidebar:
-    st.title("🎓 Smart Learning Assistant")
-    student_name = st.text_input("Your Name:", value=assistant.student_name)
-    if student_name != assistant.student_name:
-        assistant.student_name = student_name
-    
-    st.divider()
-    page = st.radio("Navigate:", [
-        "📊 Dashboard",
-        "✅ Assignments",
-        "📝 Works",
-        "🎯 Projects",
-        "⏱️ Study Log",
-        "📅 Timetable",
-        "🤖 AI Suggestions"
-    ])
-
-# Main content
-if page == "📊 Dashboard":
-    st.title("📊 Your Learning Dashboard")
-    
-    # Get dashboard data
-    summary = assistant.get_dashboard_summary()
-    analytics = summary['analytics']
-    
-    # Top metrics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("📚 Total Study Hours", f"{analytics['total_study_hours']:.1f}h")
-    
-    with col2:
-        st.metric("🔥 Current Streak", f"{analytics['current_streak']} days")
-    
-    with col3:
-        st.metric("✅ Completed Assignments", analytics['completed_assignments'])
-    
-    with col4:
-        st.metric("⭐ Average Score", f"{analytics['avg_score']:.1f}%")
-    
-    st.divider()
-    
-    # Encouragement message
-    if analytics['completed_assignments'] > 0:
-        st.success(f"🎉 {summary['encouragement']}")
-    
-    # Charts
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📖 Study Hours by Subject")
-        if analytics['subject_wise_hours']:
-            df_subjects = pd.DataFrame(list(analytics['subject_wise_hours'].items()), 
-                                      columns=['Subject', 'Hours'])
-            fig = px.bar(df_subjects, x='Subject', y='Hours', color='Hours',
-                        color_continuous_scale='Viridis')
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No study data yet. Start logging study sessions!")
-    
-    with col2:
-        st.subheader("📈 Daily Study Progress (Last 7 Days)")
-        if analytics['daily_study']:
-            df_daily = pd.DataFrame(list(analytics['daily_study'].items()),
-                                   columns=['Date', 'Hours']).sort_values('Date')
-            fig = px.line(df_daily, x='Date', y='Hours', markers=True,
-                         title="Daily Study Hours")
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No daily data available yet.")
-    
-    # Summary cards
-    st.subheader("📋 Quick Summary")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric("Total Assignments", analytics['total_assignments'])
-        st.metric("Pending", analytics['pending_assignments'])
-    
-    with col2:
-        st.metric("Total Projects", analytics['total_projects'])
-        completion_rate = (analytics['completed_works'] / max(analytics['total_works'], 1)) * 100
-        st.metric("Works Completion", f"{completion_rate:.0f}%")
-    
-    with col3:
-        st.metric("Study Streak", f"{analytics['current_streak']} days 🔥")
-
-elif page == "✅ Assignments":
-    st.title("✅ Assignments")
-    
-    tab1, tab2 = st.tabs(["View Assignments", "Add Assignment"])
-    
-    with tab1:
-        if assistant.assignments:
-            df = pd.DataFrame(assistant.assignments)
-            st.dataframe(df, use_container_width=True)
-            
-            # Filter and update
-            col1, col2 = st.columns(2)
-            with col1:
-                assignment_id = st.number_input("Assignment ID to Complete:", min_value=1)
-            with col2:
-                score = st.slider("Score (%):", 0, 100, 85)
-            
-            if st.button("✅ Mark as Complete"):
-                result = assistant.complete_assignment(int(assignment_id), score)
-                st.success(result)
-                st.rerun()
-        else:
-            st.info("No assignments yet. Create your first one!")
-    
-    with tab2:
-        st.subheader("Add New Assignment")
-        title = st.text_input("Assignment Title:")
-        subject = st.text_input("Subject:")
-        deadline_days = st.number_input("Deadline (days):", min_value=1, value=7)
-        difficulty = st.selectbox("Difficulty:", ["Easy", "Medium", "Hard"])
-        
-        if st.button("➕ Add Assignment"):
-            if title and subject:
-                result = assistant.add_assignment(title, subject, deadline_days, difficulty)
-                st.success(result)
-                st.rerun()
-            else:
-                st.error("Please fill all fields!")
-
-elif page == "📝 Works":
-    st.title("📝 Classwork & Homework")
-    
-    tab1, tab2 = st.tabs(["View Works", "Add Work"])
-    
-    with tab1:
-        if assistant.works:
-            df = pd.DataFrame(assistant.works)
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info("No works logged yet.")
-    
-    with tab2:
-        st.subheader("Add New Work")
-        title = st.text_input("Work Title:")
-        subject = st.text_input("Subject:")
-        duration = st.number_input("Duration (hours):", min_value=0.5, step=0.5, value=1.0)
-        completed = st.checkbox("Mark as Completed")
-        
-        if st.button("➕ Add Work"):
-            if title and subject:
-                result = assistant.add_work(title, subject, duration, completed)
-                st.success(result)
-                st.rerun()
-            else:
-                st.error("Please fill all fields!")
-
-elif page == "🎯 Projects":
-    st.title("🎯 Projects")
-    
-    tab1, tab2 = st.tabs(["View Projects", "Add Project"])
-    
-    with tab1:
-        if assistant.projects:
-            df = pd.DataFrame(assistant.projects)
-            st.dataframe(df, use_container_width=True)
-        else:
-            st.info("No projects yet.")
-    
-    with tab2:
-        st.subheader("Add New Project")
-        title = st.text_input("Project Title:")
-        description = st.text_area("Description:")
-        deadline_days = st.number_input("Deadline (days):", min_value=1, value=30)
-        status = st.selectbox("Status:", ["In Progress", "Planning", "Review"])
-        
-        if st.button("➕ Add Project"):
-            if title and description:
-                result = assistant.add_project(title, description, deadline_days, status)
-                st.success(result)
-                st.rerun()
-            else:
-                st.error("Please fill all fields!")
-
-elif page == "⏱️ Study Log":
-    st.title("⏱️ Study Session Log")
-    
-    tab1, tab2 = st.tabs(["View Log", "Log Session"])
-    
-    with tab1:
-        if assistant.study_log:
-            df = pd.DataFrame(assistant.study_log)
-            st.dataframe(df, use_container_width=True)
-            
-            # Statistics
-            st.subheader("Session Statistics")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Total Sessions", len(assistant.study_log))
-            with col2:
-                st.metric("Total Hours", f"{assistant.total_study_hours:.1f}h")
-        else:
-            st.info("No study sessions logged yet.")
-    
-    with tab2:
-        st.subheader("Log New Study Session")
-        subject = st.text_input("Subject:")
-        duration = st.number_input("Duration (hours):", min_value=0.25, step=0.25, value=1.0)
-        topics = st.text_area("Topics Covered (comma-separated):")
-        
-        if st.button("📝 Log Session"):
-            if subject and topics:
-                result = assistant.log_study_session(subject, duration, topics)
-                st.success(result)
-                st.rerun()
-            else:
-                st.error("Please fill all fields!")
-
-elif page == "📅 Timetable":
-    st.title("📅 Study Timetable")
-    
-    tab1, tab2 = st.tabs(["View Timetable", "Add Entry"])
-    
-    with tab1:
-        if assistant.timetable:
-            for day, entries in assistant.timetable.items():
-                st.subheader(f"📅 {day}")
-                for entry in entries:
-                    st.write(f"⏰ {entry['time']} - **{entry['subject']}** ({entry['duration']}h)")
-        else:
-            st.info("No timetable entries yet.")
-    
-    with tab2:
-        st.subheader("Add Timetable Entry")
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        day = st.selectbox("Day:", days)
-        time = st.time_input("Time:")
-        subject = st.text_input("Subject:")
-        duration = st.number_input("Duration (hours):", min_value=0.5, step=0.5, value=1.0)
-        
-        if st.button("➕ Add Entry"):
-            if subject:
-                result = assistant.add_timetable_entry(day, time.strftime("%H:%M"), subject, duration)
-                st.success(result)
-                st.rerun()
-            else:
-                st.error("Please fill all fields!")
-
-elif page == "🤖 AI Suggestions":
-    st.title("🤖 AI-Powered Suggestions")
-    
-    suggestions = assistant.get_ai_suggestions()
-    
-    if suggestions:
-        st.subheader("📌 Personalized Learning Methods:")
-        for i, suggestion in enumerate(suggestions, 1):
-            st.info(suggestion)
-    else:
-        st.info("Start your learning journey to get personalized suggestions!")
-    
-    st.divider()
-    
-    st.subheader("💡 Smart Learning Tips")
-    tips = [
-        "🎯 **Set Clear Goals**: Define what you want to achieve each week",
-        "⏱️ **Use Pomodoro Technique**: Study 25 mins, then take a 5-min break",
-        "📚 **Active Recall**: Test yourself instead of just re-reading",
-        "🔄 **Spaced Repetition**: Review material at increasing intervals",
-        "🎮 **Gamify Learning**: Create challenges and reward yourself",
-        "😴 **Get Quality Sleep**: 7-9 hours helps consolidate learning",
-        "🏃 **Exercise Daily**: Physical activity boosts cognitive function",
-        "👥 **Study with Others**: Collaborative learning improves retention"
-    ]
-    
-    for tip in tips:
-        st.write(tip)
-
-st.divider()
-st.caption("🌟 Keep learning, keep growing! Your future self will thank you. 🌟")
\ No newline at end of file
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from backend import ARCHIVE_DAYS, MAX_DEADLINE_DAYS, RECENT_DAYS, StudentStore
+from timetable import DAYS
+from instrumentation import METRICS, timed
+from datetime import date, datetime
+import os
+import time
+
+# Page config
+st.set_page_config(page_title="Smart Learning AI Assistant", layout="wide", initial_sidebar_state="expanded")
+rerun_started = time.perf_counter()
+
+# Hidden unless SLA_DIAGNOSTICS=1 or the URL has ?diagnostics=1
+show_diagnostics = (os.environ.get("SLA_DIAGNOSTICS") == "1"
+                    or st.experimental_get_query_params().get("diagnostics") == ["1"])
+
+# One store per server process: every browser session of a student shares
+# the same cached assistant and data shard. With SLA_ARCHIVE_DAYS set,
+# older study sessions are archived when a student is loaded.
+@st.cache_resource
+def get_store():
+    archive_days = os.environ.get("SLA_ARCHIVE_DAYS")
+    return StudentStore(archive_days=int(archive_days) if archive_days else None)
+
+# Derived views are cached per (student, data version, day): any mutation
+# renews the version, so reruns without changes reuse them, and streaks and
+# "today" figures move on at midnight. Arguments starting with an
+# underscore are not hashed by Streamlit.
+VIEW_CACHE_SIZE = 128
+
+@st.cache_data(max_entries=VIEW_CACHE_SIZE)
+def dashboard_summary(student_name, version, _assistant):
+    with timed("app.dashboard_summary"):
+        return _assistant.get_dashboard_summary()
+
+@st.cache_data(max_entries=VIEW_CACHE_SIZE)
+def records_frame(student_name, version, kind, _assistant):
+    with timed("app.records_frame"):
+        return pd.DataFrame(_assistant.get_records(kind))
+
+@st.cache_data(max_entries=VIEW_CACHE_SIZE)
+def records_page(student_name, version, kind, filters, _assistant):
+    with timed("app.records_page"):
+        page = _assistant.query_records(kind, **dict(filters))
+        return pd.DataFrame(page['records']), page['total']
+
+PAGE_SIZES = [25, 50, 100]
+
+def show_records_page(kind, sort_options, statuses=None, history=False):
+    """Filter widgets plus a single page of records; only that page reaches the browser"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        subject = st.text_input("Filter by subject:", key=f"{kind}_subject").strip() or None
+    with col2:
+        status = st.selectbox("Status:", ["All"] + statuses, key=f"{kind}_status") if statuses else "All"
+    with col3:
+        dates = st.date_input("Date range:", value=(), key=f"{kind}_dates")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        sort_by = st.selectbox("Sort by:", sort_options, key=f"{kind}_sort")
+    with col2:
+        descending = st.checkbox("Descending", value=kind == 'study_log', key=f"{kind}_desc")
+    with col3:
+        page_size = st.selectbox("Rows per page:", PAGE_SIZES, key=f"{kind}_size")
+    with col4:
+        page_number = st.number_input("Page:", min_value=1, value=1, key=f"{kind}_page")
+    
+    filters = (
+        ('subject', subject),
+        ('status', None if status == "All" else status),
+        ('start_date', dates[0] if dates else None),
+        ('end_date', dates[-1] if dates else None),
+        ('sort_by', sort_by),
+        ('descending', descending),
+        ('limit', page_size),
+        ('offset', (int(page_number) - 1) * page_size),
+        ('history', history),
+    )
+    df, total = records_page(student_name, version, kind, filters, assistant)
+    if total:
+        last_page = (total - 1) // page_size + 1
+        first = min((int(page_number) - 1) * page_size, total) + 1
+        st.dataframe(df, use_container_width=True)
+        st.caption(f"Showing {first}–{first + len(df) - 1} of {total} (page {int(page_number)} of {last_page})")
+    else:
+        st.info("No records match these filters.")
+
+# Charts are drawn straight from the assistant's (array) series
+@st.cache_data(max_entries=VIEW_CACHE_SIZE)
+def subject_hours_figure(student_name, version, _assistant):
+    with timed("app.subject_hours_figure"):
+        subjects, hours = _assistant.get_subject_series()
+        return px.bar(x=subjects, y=hours, color=hours,
+                      labels={'x': 'Subject', 'y': 'Hours', 'color': 'Hours'},
+                      color_continuous_scale='Viridis')
+
+@st.cache_data(max_entries=VIEW_CACHE_SIZE)
+def daily_hours_figure(student_name, version, _assistant):
+    with timed("app.daily_hours_figure"):
+        dates, hours = _assistant.get_daily_series(RECENT_DAYS)
+        return px.line(x=dates, y=hours, markers=True,
+                       labels={'x': 'Date', 'y': 'Hours'}, title="Daily Study Hours")
+
+# Sidebar
+with st.sidebar:
+    st.title("🎓 Smart Learning Assistant")
+    student_name = st.text_input("Your Name:", value="Student", key="student_name").strip() or "Student"
+    assistant = get_store().get(student_name)
+    version = (assistant.version, date.today())
+    
+    st.divider()
+    pages = [
+        "📊 Dashboard",
+        "✅ Assignments",
+        "📝 Works",
+        "🎯 Projects",
+        "⏱️ Study Log",
+        "📅 Timetable",
+        "🤖 AI Suggestions"
+    ]
+    if show_diagnostics:
+        pages.append("🩺 Diagnostics")
+    page = st.radio("Navigate:", pages)
+
+# Main content
+if page == "📊 Dashboard":
+    st.title("📊 Your Learning Dashboard")
+    
+    # Get dashboard data
+    summary = dashboard_summary(student_name, version, assistant)
+    analytics = summary['analytics']
+    
+    # Top metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("📚 Total Study Hours", f"{analytics['total_study_hours']:.1f}h")
+    
+    with col2:
+        st.metric("🔥 Current Streak", f"{analytics['current_streak']} days")
+    
+    with col3:
+        st.metric("✅ Completed Assignments", analytics['completed_assignments'])
+    
+    with col4:
+        st.metric("⭐ Average Score", f"{analytics['avg_score']:.1f}%")
+    
+    st.divider()
+    
+    # Encouragement message
+    if analytics['completed_assignments'] > 0:
+        st.success(f"🎉 {summary['encouragement']}")
+    
+    # Charts
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📖 Study Hours by Subject")
+        if analytics['subject_wise_hours']:
+            fig = subject_hours_figure(student_name, version, assistant)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No study data yet. Start logging study sessions!")
+    
+    with col2:
+        st.subheader("📈 Daily Study Progress (Last 7 Days)")
+        if analytics['daily_study']:
+            fig = daily_hours_figure(student_name, version, assistant)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No daily data available yet.")
+    
+    # Summary cards
+    st.subheader("📋 Quick Summary")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Total Assignments", analytics['total_assignments'])
+        st.metric("Pending", analytics['pending_assignments'])
+    
+    with col2:
+        st.metric("Total Projects", analytics['total_projects'])
+        completion_rate = (analytics['completed_works'] / max(analytics['total_works'], 1)) * 100
+        st.metric("Works Completion", f"{completion_rate:.0f}%")
+    
+    with col3:
+        st.metric("Study Streak", f"{analytics['current_streak']} days 🔥")
+        st.metric("Overdue", summary['overdue'])
+    
+    # Most urgent unfinished work, from the deadline index
+    st.subheader("⏰ Most Urgent")
+    if summary['urgent']:
+        df_urgent = pd.DataFrame(summary['urgent'])[['title', 'kind', 'subject', 'difficulty', 'deadline', 'days_left']]
+        st.dataframe(df_urgent, use_container_width=True)
+    else:
+        st.info("Nothing due. Enjoy the free time!")
+
+elif page == "✅ Assignments":
+    st.title("✅ Assignments")
+    
+    tab1, tab2 = st.tabs(["View Assignments", "Add Assignment"])
+    
+    with tab1:
+        if assistant.assignments:
+            show_records_page('assignments', ['deadline', 'id', 'created_date', 'score'],
+                              ['Pending', 'Completed'])
+            
+            # Filter and update
+            col1, col2 = st.columns(2)
+            with col1:
+                assignment_id = st.number_input("Assignment ID:", min_value=1)
+            with col2:
+                score = st.slider("Score (%):", 0, 100, 85)
+            
+            if st.button("✅ Mark as Complete"):
+                result = assistant.complete_assignment(int(assignment_id), score)
+                st.success(result)
+                st.rerun()
+            
+            if st.button("🗑️ Delete Assignment"):
+                result = assistant.delete_assignment(int(assignment_id))
+                st.success(result)
+                st.rerun()
+        else:
+            st.info("No assignments yet. Create your first one!")
+    
+    with tab2:
+        st.subheader("Add New Assignment")
+        title = st.text_input("Assignment Title:")
+        subject = st.text_input("Subject:")
+        deadline_days = st.number_input("Deadline (days):", min_value=1, max_value=MAX_DEADLINE_DAYS, value=7)
+        difficulty = st.selectbox("Difficulty:", ["Easy", "Medium", "Hard"])
+        
+        if st.button("➕ Add Assignment"):
+            if title and subject:
+                result = assistant.add_assignment(title, subject, deadline_days, difficulty)
+                st.success(result)
+                st.rerun()
+            else:
+                st.error("Please fill all fields!")
+
+elif page == "📝 Works":
+    st.title("📝 Classwork & Homework")
+    
+    tab1, tab2 = st.tabs(["View Works", "Add Work"])
+    
+    with tab1:
+        if assistant.works:
+            show_records_page('works', ['date', 'id', 'duration_hours'], ['Pending', 'Completed'])
+        else:
+            st.info("No works logged yet.")
+    
+    with tab2:
+        st.subheader("Add New Work")
+        title = st.text_input("Work Title:")
+        subject = st.text_input("Subject:")
+        duration = st.number_input("Duration (hours):", min_value=0.5, step=0.5, value=1.0)
+        completed = st.checkbox("Mark as Completed")
+        
+        if st.button("➕ Add Work"):
+            if title and subject:
+                result = assistant.add_work(title, subject, duration, completed)
+                st.success(result)
+                st.rerun()
+            else:
+                st.error("Please fill all fields!")
+
+elif page == "🎯 Projects":
+    st.title("🎯 Projects")
+    
+    tab1, tab2 = st.tabs(["View Projects", "Add Project"])
+    
+    with tab1:
+        if assistant.projects:
+            df = records_frame(student_name, version, 'projects', assistant)
+            st.dataframe(df, use_container_width=True)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                project_id = st.number_input("Project ID:", min_value=1)
+            with col2:
+                progress = st.slider("Progress (%):", 0, 100, 50)
+            
+            if st.button("📈 Update Progress"):
+                result = assistant.update_project_progress(int(project_id), progress)
+                st.success(result)
+                st.rerun()
+        else:
+            st.info("No projects yet.")
+    
+    with tab2:
+        st.subheader("Add New Project")
+        title = st.text_input("Project Title:")
+        description = st.text_area("Description:")
+        deadline_days = st.number_input("Deadline (days):", min_value=1, max_value=MAX_DEADLINE_DAYS, value=30)
+        status = st.selectbox("Status:", ["In Progress", "Planning", "Review"])
+        
+        if st.button("➕ Add Project"):
+            if title and description:
+                result = assistant.add_project(title, description, deadline_days, status)
+                st.success(result)
+                st.rerun()
+            else:
+                st.error("Please fill all fields!")
+
+elif page == "⏱️ Study Log":
+    st.title("⏱️ Study Session Log")
+    
+    tab1, tab2 = st.tabs(["View Log", "Log Session"])
+    
+    with tab1:
+        if assistant.get_session_count():
+            # Archived sessions are only read back from their segment files when asked for
+            history = bool(assistant.archived) and st.checkbox(
+                f"Include {assistant.archived} archived sessions", key="study_history")
+            # Topic search goes through the inverted topic index
+            query = st.text_input("🔎 Search topics:", placeholder="e.g. quadratic equ").strip()
+            if query:
+                found = assistant.search_sessions(query, limit=PAGE_SIZES[-1], history=history)
+                if found['total']:
+                    st.dataframe(pd.DataFrame(found['records']), use_container_width=True)
+                    st.caption(f"{found['total']} session(s) mention '{query}'"
+                               + (f", showing the latest {len(found['records'])}"
+                                  if found['total'] > len(found['records']) else ""))
+                else:
+                    st.info(f"No sessions mention '{query}'.")
+            else:
+                show_records_page('study_log', ['timestamp', 'duration_hours'], history=history)
+            
+            # Topic statistics
+            st.subheader("Topics")
+            col1, col2 = st.columns(2)
+            with col1:
+                topic_subject = st.selectbox("Subject:", ["All"] + sorted(assistant.get_topic_breakdown()),
+                                             key="topic_subject")
+            with col2:
+                topic_sort = st.selectbox("Sort by:", ["sessions", "hours", "last_studied"], key="topic_sort")
+            topic_stats = assistant.get_topic_stats(None if topic_subject == "All" else topic_subject,
+                                                    topic_sort, limit=20)
+            if topic_stats:
+                st.dataframe(pd.DataFrame(topic_stats), use_container_width=True)
+            
+            # Statistics
+            st.subheader("Session Statistics")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Total Sessions", assistant.get_session_count())
+            with col2:
+                st.metric("Total Hours", f"{assistant.total_study_hours:.1f}h")
+            
+            with st.expander("🗄️ Archive Old Sessions"):
+                st.caption("Moves old sessions out of the data file into a compressed archive. "
+                           "Charts and statistics stay the same.")
+                archive_days = st.number_input("Older than (days):", min_value=0, value=ARCHIVE_DAYS, step=30)
+                if st.button("Archive"):
+                    st.success(assistant.archive_sessions(int(archive_days)))
+                    st.rerun()
+        else:
+            st.info("No study sessions logged yet.")
+    
+    with tab2:
+        st.subheader("Log New Study Session")
+        subject = st.text_input("Subject:")
+        duration = st.number_input("Duration (hours):", min_value=0.25, step=0.25, value=1.0)
+        topics = st.text_area("Topics Covered (comma-separated):")
+        
+        if st.button("📝 Log Session"):
+            if subject and topics:
+                result = assistant.log_study_session(subject, duration, topics)
+                st.success(result)
+                st.rerun()
+            else:
+                st.error("Please fill all fields!")
+
+elif page == "📅 Timetable":
+    st.title("📅 Study Timetable")
+    
+    next_entry = assistant.get_next_entry()
+    if next_entry:
+        if next_entry['in_progress']:
+            st.info(f"▶️ Now: **{next_entry['subject']}** until {next_entry['end']}")
+        else:
+            st.info(f"⏭️ Next: **{next_entry['subject']}** on {next_entry['day']} at {next_entry['time']}")
+    
+    tab1, tab2, tab3 = st.tabs(["View Timetable", "Add Entry", "Auto-Schedule"])
+    
+    with tab1:
+        timetable = assistant.get_timetable()
+        if timetable:
+            # Weekdays in order, entries sorted by start time
+            for day in DAYS + [day for day in timetable if day not in DAYS]:
+                entries = timetable.get(day)
+                if not entries:
+                    continue
+                st.subheader(f"📅 {day}")
+                for entry in entries:
+                    note = f" - {entry['note']}" if entry.get('note') else ""
+                    st.write(f"⏰ {entry['time']} - **{entry['subject']}** ({entry['duration']}h){note}")
+            
+            for day, first, second in assistant.get_timetable_conflicts():
+                st.warning(f"⚠️ {day}: {first['subject']} at {first['time']} overlaps "
+                           f"{second['subject']} at {second['time']}")
+            
+            st.subheader("Weekly Load")
+            st.bar_chart(pd.Series(assistant.get_weekly_load(), name="Hours"))
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                remove_day = st.selectbox("Day:", DAYS, key="remove_day")
+            with col2:
+                remove_time = st.selectbox("Entry:", [entry['time'] for entry in timetable.get(remove_day, [])],
+                                           key="remove_time")
+            if st.button("🗑️ Remove Entry") and remove_time:
+                result = assistant.remove_timetable_entry(remove_day, remove_time)
+                st.success(result)
+                st.rerun()
+        else:
+            st.info("No timetable entries yet.")
+    
+    with tab2:
+        st.subheader("Add Timetable Entry")
+        day = st.selectbox("Day:", DAYS)
+        start_time = st.time_input("Time:")
+        subject = st.text_input("Subject:")
+        duration = st.number_input("Duration (hours):", min_value=0.5, step=0.5, value=1.0)
+        
+        free_slots = assistant.get_free_slots(day, duration)
+        if free_slots:
+            st.caption("Free on " + day + ": " + ", ".join(f"{slot['start']}–{slot['end']}" for slot in free_slots))
+        
+        if st.button("➕ Add Entry"):
+            if subject:
+                result = assistant.add_timetable_entry(day, start_time.strftime("%H:%M"), subject, duration)
+                if result.startswith("Timetable updated"):
+                    st.success(result)
+                    st.rerun()
+                else:
+                    st.error(result)
+            else:
+                st.error("Please fill all fields!")
+    
+    with tab3:
+        st.subheader("Plan Pending Assignments")
+        st.write("Pending assignments are placed, earliest deadline first, into the free slots of the coming week.")
+        plan = assistant.schedule_assignments()
+        if plan['scheduled']:
+            st.dataframe(pd.DataFrame(plan['scheduled'])[['date', 'day', 'time', 'duration', 'subject', 'note']],
+                         use_container_width=True)
+            if st.button("📅 Add to Timetable"):
+                plan = assistant.schedule_assignments(apply=True)
+                st.success(f"{len(plan['scheduled'])} study block(s) added to your timetable")
+                st.rerun()
+        else:
+            st.info("No pending assignments to schedule.")
+        if plan['unscheduled']:
+            st.warning("No free slot before the deadline for: "
+                       + ", ".join(item['title'] for item in plan['unscheduled']))
+        if plan['already_scheduled']:
+            st.caption("Already in your timetable: "
+                       + ", ".join(item['title'] for item in plan['already_scheduled']))
+
+elif page == "🤖 AI Suggestions":
+    st.title("🤖 AI-Powered Suggestions")
+    
+    suggestions = dashboard_summary(student_name, version, assistant)['suggestions']
+    
+    if suggestions:
+        st.subheader("📌 Personalized Learning Methods:")
+        for i, suggestion in enumerate(suggestions, 1):
+            st.info(suggestion)
+    else:
+        st.info("Start your learning journey to get personalized suggestions!")
+    
+    st.divider()
+    
+    st.subheader("🔁 Due for Review")
+    due_reviews = assistant.get_due_reviews(10)
+    if due_reviews:
+        for item in due_reviews:
+            st.write(f"**{item['topic']}** ({item['subject']}) - due {item['due']}, "
+                     f"last reviewed {item['last_review']}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            review = st.selectbox("Topic:", due_reviews,
+                                  format_func=lambda item: f"{item['topic']} ({item['subject']})")
+        with col2:
+            grade = st.select_slider("How well did you recall it?", ["Again", "Hard", "Good", "Easy"], value="Good")
+        
+        if st.button("✅ Record Review"):
+            quality = {'Again': 1, 'Hard': 3, 'Good': 4, 'Easy': 5}[grade]
+            result = assistant.review_topic(review['subject'], review['topic'], quality)
+            st.success(result)
+            st.rerun()
+    else:
+        st.info("Nothing to review today. Topics from your study sessions show up here when they are due.")
+    
+    st.divider()
+    
+    st.subheader("💡 Smart Learning Tips")
+    tips = [
+        "🎯 **Set Clear Goals**: Define what you want to achieve each week",
+        "⏱️ **Use Pomodoro Technique**: Study 25 mins, then take a 5-min break",
+        "📚 **Active Recall**: Test yourself instead of just re-reading",
+        "🔄 **Spaced Repetition**: Review material at increasing intervals",
+        "🎮 **Gamify Learning**: Create challenges and reward yourself",
+        "😴 **Get Quality Sleep**: 7-9 hours helps consolidate learning",
+        "🏃 **Exercise Daily**: Physical activity boosts cognitive function",
+        "👥 **Study with Others**: Collaborative learning improves retention"
+    ]
+    
+    for tip in tips:
+        st.write(tip)
+
+elif page == "🩺 Diagnostics":
+    st.title("🩺 Diagnostics")
+    
+    METRICS.enabled = st.checkbox("Collect metrics", value=METRICS.enabled)
+    if st.button("🔄 Reset metrics"):
+        METRICS.reset()
+    
+    snapshot = METRICS.snapshot()
+    durations = snapshot['metrics'].get('duration_seconds', {})
+    if durations:
+        st.subheader("Latency")
+        st.dataframe(pd.DataFrame([
+            {'Name': name, 'Calls': h['count'], 'Mean (ms)': h['mean'] * 1000,
+             'Max (ms)': h['max'] * 1000, 'Total (s)': h['sum'],
+             'Errors': snapshot['errors'].get(name, 0)}
+            for name, h in durations.items()
+        ]), use_container_width=True)
+    writes = snapshot['metrics'].get('write_bytes', {})
+    if writes:
+        st.subheader("Bytes written")
+        st.dataframe(pd.DataFrame([
+            {'Name': name, 'Writes': h['count'], 'Mean (KiB)': h['mean'] / 1024,
+             'Max (KiB)': h['max'] / 1024, 'Total (KiB)': h['sum'] / 1024}
+            for name, h in writes.items()
+        ]), use_container_width=True)
+    if not durations and not writes:
+        st.info("No metrics recorded yet. Enable collection and use the app.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ JSON", METRICS.to_json(), file_name="metrics.json")
+    with col2:
+        st.download_button("⬇️ Prometheus", METRICS.to_prometheus(), file_name="metrics.prom")
+    with st.expander("Prometheus text"):
+        st.code(METRICS.to_prometheus())
+
+st.divider()
+st.caption("🌟 Keep learning, keep growing! Your future self will thank you. 🌟")
+
+# Whole-rerun duration, labelled by the page that was rendered
+rerun_seconds = time.perf_counter() - rerun_started
+METRICS.observe('duration_seconds', "app.rerun", rerun_seconds)
+METRICS.observe('duration_seconds', f"app.page.{page.split(' ', 1)[1]}", rerun_seconds)
\ No newline at end of file
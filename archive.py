@@ -0,0 +1,165 @@
+"""Archive of old study sessions: rollups plus compressed binary segments.
+
+Archiving moves the oldest stretch of the study log out of the data file.
+What the assistant needs at every start is kept as small rollups next to
+the other data (under 'archive'):
+
+    sessions, hours   counts of everything archived
+    subjects          [subject, hours, sessions], in first-studied order
+    days              [date, subject, hours, sessions] per day and subject
+    daily             [date, hours] per day
+    topics            [subject, topic, sessions, hours, first, last]
+    segments          [{'file', 'start', 'sessions', 'first', 'last'}]
+
+Hours are summed in log order, and the archived sessions are always a
+prefix of the log, so adding the live sessions on top of the rollups
+gives the same floats as summing the whole history did.
+
+The raw sessions go to segment files: a magic line, then zlib-compressed
+columns (day deltas, seconds into the day, subject and topic-text indexes,
+hours) with a small JSON header of the subject and topic strings. They
+are only read back when history is asked for explicitly.
+"""
+from array import array
+import json
+import os
+import sys
+import tempfile
+import zlib
+
+from records import DAY_SECONDS, StudySession, day_text
+from reviews import parse_topics
+
+SEGMENT_MAGIC = b'SLA-SESSIONS-1\n'
+
+# (column, array typecode), in file order
+SEGMENT_COLUMNS = (('day', 'i'), ('second', 'i'), ('subject', 'I'), ('topics', 'I'), ('hours', 'd'))
+
+
+def empty_archive():
+    return {'sessions': 0, 'hours': 0.0, 'subjects': [], 'days': [], 'daily': [], 'topics': [],
+            'segments': []}
+
+
+def add_sessions(archive, sessions, subjects):
+    """Fold sessions (compact records, oldest first) into the archive rollups"""
+    totals = {row[0]: row for row in archive['subjects']}
+    cells = {(row[0], row[1]): row for row in archive['days']}
+    daily = {row[0]: row for row in archive['daily']}
+    topics = {(row[0], row[1]): row for row in archive['topics']}
+    hours = archive['hours']
+    for session in sessions:
+        subject = subjects.name(session.subject)
+        day = day_text(session.day)
+        hours += session.hours
+        row = totals.get(subject)
+        if row is None:
+            row = totals[subject] = [subject, 0.0, 0]
+            archive['subjects'].append(row)
+        row[1] += session.hours
+        row[2] += 1
+        row = cells.get((day, subject))
+        if row is None:
+            row = cells[day, subject] = [day, subject, 0.0, 0]
+            archive['days'].append(row)
+        row[2] += session.hours
+        row[3] += 1
+        row = daily.get(day)
+        if row is None:
+            row = daily[day] = [day, 0.0]
+            archive['daily'].append(row)
+        row[1] += session.hours
+        for topic in parse_topics(session.topics):
+            row = topics.get((subject, topic))
+            if row is None:
+                row = topics[subject, topic] = [subject, topic, 0, 0.0, day, day]
+                archive['topics'].append(row)
+            row[2] += 1
+            row[3] += session.hours
+            row[4] = min(row[4], day)
+            row[5] = max(row[5], day)
+    archive['sessions'] += len(sessions)
+    archive['hours'] = hours
+    return archive
+
+
+def segment_file(data_file, start):
+    """Segment path for sessions numbered from start on, next to the data file"""
+    return f"{os.path.splitext(data_file)[0]}.sessions-{start}.seg"
+
+
+def write_segment(path, sessions, subjects):
+    """Write sessions to a segment file atomically; returns its size in bytes"""
+    names, name_ids, texts, text_ids = [], {}, [], {}
+    columns = {name: array(code) for name, code in SEGMENT_COLUMNS}
+    extras = {}
+    previous = 0
+    for i, session in enumerate(sessions):
+        subject = subjects.name(session.subject)
+        if subject not in name_ids:
+            name_ids[subject] = len(names)
+            names.append(subject)
+        if session.topics not in text_ids:
+            text_ids[session.topics] = len(texts)
+            texts.append(session.topics)
+        # Days as deltas and times as seconds into their day compress to almost nothing
+        columns['day'].append(session.day - previous)
+        columns['second'].append(session.time - session.day * DAY_SECONDS)
+        columns['subject'].append(name_ids[subject])
+        columns['topics'].append(text_ids[session.topics])
+        columns['hours'].append(session.hours)
+        if session.extra:
+            extras[i] = session.extra
+        previous = session.day
+    header = json.dumps({'count': len(sessions), 'subjects': names, 'topics': texts, 'extras': extras},
+                        separators=(',', ':')).encode('utf-8')
+    parts = [len(header).to_bytes(4, 'little'), header]
+    for name, _ in SEGMENT_COLUMNS:
+        if sys.byteorder == 'big':
+            columns[name].byteswap()
+        parts.append(columns[name].tobytes())
+    payload = SEGMENT_MAGIC + zlib.compress(b''.join(parts), 9)
+
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path),
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+    return len(payload)
+
+
+def read_segment(path, subjects):
+    """Sessions of a segment file as compact records, subjects interned into `subjects`"""
+    with open(path, 'rb') as f:
+        payload = f.read()
+    if not payload.startswith(SEGMENT_MAGIC):
+        raise ValueError(f"Not a session segment: {path}")
+    data = zlib.decompress(payload[len(SEGMENT_MAGIC):])
+    size = int.from_bytes(data[:4], 'little')
+    header = json.loads(data[4:4 + size])
+    count, offset = header['count'], 4 + size
+    columns = {}
+    for name, code in SEGMENT_COLUMNS:
+        column = array(code)
+        end = offset + count * column.itemsize
+        column.frombytes(data[offset:end])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        columns[name] = column
+        offset = end
+    subject_ids = [subjects.intern(name) for name in header['subjects']]
+    texts = header['topics']
+    extras = header['extras']
+    sessions, day = [], 0
+    for i, (delta, second, subject, topics, hours) in enumerate(zip(*columns.values())):
+        day += delta
+        sessions.append(StudySession(day, day * DAY_SECONDS + second, subject_ids[subject], hours,
+                                     texts[topics], extras.get(str(i))))
+    return sessions
+
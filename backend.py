@@ -1,238 +1,1487 @@
-import json
-import os
-from datetime import datetime, timedelta
-from collections import defaultdict
-import random
-
-class SmartLearningAssistant:
-    def __init__(self, student_name="Student"):
-        self.student_name = student_name
-        self.data_file = "student_data.json"
-        self.load_data()
-        
-    def load_data(self):
-        """Load student data from file or initialize new"""
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.assignments = data.get('assignments', [])
-                self.works = data.get('works', [])
-                self.projects = data.get('projects', [])
-                self.study_log = data.get('study_log', [])
-                self.timetable = data.get('timetable', {})
-                self.streak = data.get('streak', 0)
-                self.total_study_hours = data.get('total_study_hours', 0.0)
-        else:
-            self.assignments = []
-            self.works = []
-            self.projects = []
-            self.study_log = []
-            self.timetable = {}
-            self.streak = 0
-            self.total_study_hours = 0.0
-    
-    def save_data(self):
-        """Save all student data to file"""
-        data = {
-            'assignments': self.assignments,
-            'works': self.works,
-            'projects': self.projects,
-            'study_log': self.study_log,
-            'timetable': self.timetable,
-            'streak': self.streak,
-            'total_study_hours': self.total_study_hours
-        }
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
-    
-    def add_assignment(self, title, subject, deadline_days, difficulty="Medium"):
-        """Add new assignment"""
-        deadline = (datetime.now() + timedelta(days=deadline_days)).strftime("%Y-%m-%d")
-        assignment = {
-            'id': len(self.assignments) + 1,
-            'title': title,
-            'subject': subject,
-            'deadline': deadline,
-            'difficulty': difficulty,
-            'status': 'Pending',
-            'created_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self.assignments.append(assignment)
-        self.save_data()
-        return f"Assignment '{title}' added successfully!"
-    
-    def add_work(self, title, subject, duration_hours, completed=False):
-        """Add classwork/homework"""
-        work = {
-            'id': len(self.works) + 1,
-            'title': title,
-            'subject': subject,
-            'duration_hours': duration_hours,
-            'completed': completed,
-            'date': datetime.now().strftime("%Y-%m-%d"),
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        self.works.append(work)
-        self.save_data()
-        return f"Work '{title}' added successfully!"
-    
-    def add_project(self, title, description, deadline_days, status="In Progress"):
-        """Add project"""
-        deadline = (datetime.now() + timedelta(days=deadline_days)).strftime("%Y-%m-%d")
-        project = {
-            'id': len(self.projects) + 1,
-            'title': title,
-            'description': description,
-            'deadline': deadline,
-            'status': status,
-            'progress': 0,
-            'created_date': datetime.now().strftime("%Y-%m-%d")
-        }
-        self.projects.append(project)
-        self.save_data()
-        return f"Project '{title}' added successfully!"
-    
-    def log_study_session(self, subject, duration_hours, topics_covered):
-        """Log study session"""
-        session = {
-            'date': datetime.now().strftime("%Y-%m-%d"),
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'subject': subject,
-            'duration_hours': duration_hours,
-            'topics': topics_covered
-        }
-        self.study_log.append(session)
-        self.total_study_hours += duration_hours
-        self.update_streak()
-        self.save_data()
-        return f"Study session logged: {duration_hours}h on {subject}"
-    
-    def add_timetable_entry(self, day, time, subject, duration):
-        """Add timetable entry"""
-        if day not in self.timetable:
-            self.timetable[day] = []
-        entry = {'time': time, 'subject': subject, 'duration': duration}
-        self.timetable[day].append(entry)
-        self.save_data()
-        return f"Timetable updated for {day}"
-    
-    def update_streak(self):
-        """Update study streak based on daily activity"""
-        if not self.study_log:
-            self.streak = 0
-            return
-        
-        today = datetime.now().strftime("%Y-%m-%d")
-        today_studied = any(log['date'] == today for log in self.study_log)
-        
-        if today_studied:
-            self.streak += 1
-        self.save_data()
-    
-    def complete_assignment(self, assignment_id, score):
-        """Mark assignment complete"""
-        for assignment in self.assignments:
-            if assignment['id'] == assignment_id:
-                assignment['status'] = 'Completed'
-                assignment['score'] = score
-                assignment['completion_date'] = datetime.now().strftime("%Y-%m-%d")
-                self.save_data()
-                return f"Assignment marked complete with score: {score}%"
-        return "Assignment not found"
-    
-    def get_ai_suggestions(self):
-        """Generate AI suggestions based on performance"""
-        suggestions = []
-        
-        # Analyze study patterns
-        if self.total_study_hours < 10:
-            suggestions.append("💡 Increase daily study sessions to at least 2 hours")
-        
-        # Check pending assignments
-        pending = [a for a in self.assignments if a['status'] == 'Pending']
-        if pending:
-            suggestions.append(f"⚠️  You have {len(pending)} pending assignments. Prioritize them!")
-        
-        # Analyze performance
-        completed = [a for a in self.assignments if a['status'] == 'Completed']
-        if completed:
-            avg_score = sum(a.get('score', 0) for a in completed) / len(completed)
-            if avg_score < 70:
-                suggestions.append("📚 Your average score is below 70%. Focus on difficult topics")
-            elif avg_score > 85:
-                suggestions.append("⭐ Excellent performance! Keep it up!")
-        
-        # Streak motivation
-        if self.streak >= 7:
-            suggestions.append(f"🔥 Amazing streak of {self.streak} days! You're on fire!")
-        elif self.streak == 0:
-            suggestions.append("🚀 Start your learning journey today!")
-        
-        # Subject analysis
-        subject_study = defaultdict(float)
-        for log in self.study_log[-7:]:  # Last 7 days
-            subject_study[log['subject']] += log['duration_hours']
-        
-        if subject_study:
-            least_studied = min(subject_study, key=subject_study.get)
-            suggestions.append(f"📖 Spend more time on {least_studied}")
-        
-        return suggestions
-    
-    def get_encouragement(self):
-        """Get personalized encouragement"""
-        encouragements = [
-            f"🌟 Great job today, {self.student_name}! Keep pushing forward!",
-            f"🎯 You're doing amazing, {self.student_name}! Stay focused!",
-            f"💪 Proud of your effort, {self.student_name}! You got this!",
-            f"🏆 Excellence is your path, {self.student_name}! Well done!",
-            f"✨ You're crushing it, {self.student_name}! Never give up!",
-            f"🚀 {self.student_name}, you're a star! Keep shining!",
-        ]
-        return random.choice(encouragements)
-    
-    def get_study_analytics(self):
-        """Get analytics for visualization"""
-        analytics = {
-            'total_study_hours': self.total_study_hours,
-            'current_streak': self.streak,
-            'total_assignments': len(self.assignments),
-            'completed_assignments': len([a for a in self.assignments if a['status'] == 'Completed']),
-            'pending_assignments': len([a for a in self.assignments if a['status'] == 'Pending']),
-            'total_projects': len(self.projects),
-            'total_works': len(self.works),
-            'completed_works': len([w for w in self.works if w['completed']]),
-        }
-        
-        # Subject-wise breakdown
-        subject_hours = defaultdict(float)
-        for log in self.study_log:
-            subject_hours[log['subject']] += log['duration_hours']
-        analytics['subject_wise_hours'] = dict(subject_hours)
-        
-        # Daily study hours (last 7 days)
-        daily_study = defaultdict(float)
-        for log in self.study_log[-30:]:  # Last 30 entries
-            daily_study[log['date']] += log['duration_hours']
-        analytics['daily_study'] = dict(daily_study)
-        
-        # Performance scores
-        scores = [a.get('score', 0) for a in self.assignments if a.get('score')]
-        if scores:
-            analytics['avg_score'] = sum(scores) / len(scores)
-        else:
-            analytics['avg_score'] = 0
-        
-        return analytics
-    
-    def get_dashboard_summary(self):
-        """Get complete dashboard summary"""
-        return {
-            'student_name': self.student_name,
-            'analytics': self.get_study_analytics(),
-            'suggestions': self.get_ai_suggestions(),
-            'encouragement': self.get_encouragement(),
-            'assignments': self.assignments[-5:],  # Last 5
-            'projects': self.projects,
-            'timetable': self.timetable
-        }
\ No newline at end of file
+from datetime import date, datetime, timedelta
+from collections import defaultdict, Counter, OrderedDict
+from functools import wraps
+from itertools import chain, count, islice
+import csv
+import hashlib
+import heapq
+import json
+import math
+import os
+import random
+import re
+import shutil
+import threading
+
+from archive import add_sessions, empty_archive, read_segment, segment_file, write_segment
+from columns import HAVE_NUMPY, StudyCalendar
+from deadlines import DeadlineIndex
+from instrumentation import instrumented
+from records import (RECORD_TYPES, Assignment, StudySession, SubjectTable, Work,
+                     day_ordinal, day_text, now_seconds)
+from reviews import SESSION_QUALITY, ReviewScheduler, parse_topics
+from storage import DeferredStorage, create_storage
+from suggestions import SuggestionEngine
+from timetable import DAY_MINUTES, DAYS, STUDY_END, STUDY_START, Timetable, parse_time, time_text
+from topics import TopicIndex
+
+# Days covered by the daily chart and the subject balance suggestion
+RECENT_DAYS = 7
+
+# Loaded students kept in memory by StudentStore before LRU eviction
+STORE_CACHE_SIZE = 256
+
+# Sessions older than this many days are what archive_sessions() moves out
+ARCHIVE_DAYS = 90
+
+# Furthest ahead (or back, for work already overdue), in days, a new assignment or project can be due
+MAX_DEADLINE_DAYS = 3650
+
+# Fewest sessions worth a new segment when archiving automatically on load
+ARCHIVE_MIN_SESSIONS = 1000
+
+# Field order used by bulk export, per collection
+RECORD_FIELDS = {
+    'assignments': ['id', 'title', 'subject', 'deadline', 'difficulty', 'status',
+                    'created_date', 'score', 'completion_date'],
+    'works': ['id', 'title', 'subject', 'duration_hours', 'completed', 'date', 'timestamp'],
+    'study_log': ['date', 'timestamp', 'subject', 'duration_hours', 'topics'],
+}
+
+# Collections whose records carry an id, with the label used in messages
+KEYED_COLLECTIONS = {'assignments': "Assignment", 'works': "Work", 'projects': "Project"}
+
+# Fields that update_record may change, per collection, with the types they take
+NUMBER = (int, float)
+UPDATABLE_FIELDS = {
+    'assignments': {'title': str, 'subject': str, 'deadline': str, 'difficulty': str, 'status': str,
+                    'score': NUMBER + (type(None),), 'completion_date': (str, type(None))},
+    'works': {'title': str, 'subject': str, 'duration_hours': NUMBER, 'completed': bool, 'date': str},
+    'projects': {'title': str, 'description': str, 'deadline': str, 'status': str, 'progress': NUMBER},
+}
+
+# Values update_record allows for fields that take a fixed set of them
+FIELD_CHOICES = {
+    'difficulty': ('Easy', 'Medium', 'Hard'),
+    ('assignments', 'status'): ('Pending', 'Completed'),
+}
+
+# Date fields, checked with day_ordinal; percentages, between 0 and 100
+DATE_FIELDS = {'deadline', 'date', 'completion_date'}
+PERCENT_FIELDS = {'score', 'progress'}
+
+# Days of lead time a difficulty adds when ranking work by urgency; a Hard
+# assignment due in three days is as urgent as an Easy one due tomorrow.
+# Projects rank like Medium assignments.
+URGENCY_LEAD_DAYS = {'Easy': 0, 'Medium': 1, 'Hard': 2}
+
+# Hours auto-scheduling books for a pending assignment, by difficulty
+SCHEDULE_HOURS = {'Easy': 1.0, 'Medium': 1.5, 'Hard': 2.0}
+
+# Topic stats sort keys -> position in the [sessions, hours, first, last] entries
+TOPIC_SORTS = {'sessions': 0, 'hours': 1, 'last_studied': 3}
+
+# Per collection: date field used by range filters, default sort field
+QUERY_FIELDS = {
+    'assignments': ('deadline', 'deadline'),
+    'works': ('date', 'date'),
+    'projects': ('deadline', 'deadline'),
+    'study_log': ('date', 'timestamp'),
+}
+
+
+def read_records(stream, fmt="csv"):
+    """Yield row dicts from a CSV or JSON Lines text stream"""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+
+def _text(row, field, default=None):
+    value = row.get(field)
+    if value is None or str(value).strip() == '':
+        if default is None:
+            raise ValueError(f"missing {field}")
+        return default
+    return str(value).strip()
+
+
+def _day(row, field, default=None):
+    value = _text(row, field, default)
+    date.fromisoformat(value[:10])  # raises ValueError on bad dates
+    return value[:10]
+
+
+def _topics(row):
+    """Topics of an imported row as text; JSON rows may also give a list of topics"""
+    value = row.get('topics')
+    if value is None:
+        return ''
+    if isinstance(value, list) and all(isinstance(topic, str) for topic in value):
+        return ', '.join(value)
+    if not isinstance(value, str):
+        raise TypeError(f"topics must be text, not {type(value).__name__}")
+    return value
+
+
+def _flag(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+# One version sequence for all assistants: a student evicted and loaded
+# again must not come back with a version some cached view was keyed on
+_versions = count(1)
+
+
+def _check_fields(kind, fields):
+    """Raise if update_record is given a field it cannot change, or a value of the wrong
+    type or out of range; nothing has been touched yet at that point"""
+    types = UPDATABLE_FIELDS[kind]
+    unknown = set(fields) - types.keys()
+    if unknown:
+        raise ValueError(f"Cannot update {', '.join(sorted(unknown))} on {kind}")
+    for name, value in fields.items():
+        if not isinstance(value, types[name]) or (isinstance(value, bool) and types[name] is not bool):
+            raise TypeError(f"{name} cannot be {type(value).__name__}")
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(f"{name} must be a finite number")
+        choices = FIELD_CHOICES.get((kind, name), FIELD_CHOICES.get(name))
+        if choices and value not in choices:
+            raise ValueError(f"{name} must be one of {', '.join(choices)}")
+        if name in DATE_FIELDS and value is not None:
+            day_ordinal(value)  # raises ValueError on bad dates
+        if name in PERCENT_FIELDS and value is not None and not 0 <= value <= 100:
+            raise ValueError(f"{name} must be between 0 and 100")
+        if name == 'duration_hours' and value < 0:
+            raise ValueError("duration_hours must not be negative")
+
+
+def _check_number(name, value, low, high=math.inf, positive=False):
+    """Raise unless a mutator argument is a finite number from low to high (above low
+    when positive); checked before anything, an id included, is allocated"""
+    if isinstance(value, bool) or not isinstance(value, NUMBER):
+        raise TypeError(f"{name} cannot be {type(value).__name__}")
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number")
+    if positive and value <= low:
+        raise ValueError(f"{name} must be above {low}")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be at least {low}" if high == math.inf else f"{name} must be between {low} and {high}")
+
+
+def synchronized(method):
+    """Serialize a method with other threads sharing the same assistant: mutators, and
+    readers that walk collections a mutation (or a reload) may change under them"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class SmartLearningAssistant:
+    def __init__(self, student_name="Student", storage_mode="json", data_file="student_data.json",
+                 defer_writes=False, archive_days=None):
+        self.student_name = student_name
+        self.data_file = data_file
+        # "json" rewrites the whole file on every change, "journal" appends
+        # one compact record per change, "sqlite" keeps indexed tables
+        self.storage_mode = storage_mode
+        self.storage = create_storage(storage_mode, data_file)
+        if defer_writes:
+            # Changes stay in memory until flush() writes them in one go
+            self.storage = DeferredStorage(self.storage)
+        self.lock = threading.RLock()
+        # Renewed by every load and mutation; lets callers cache derived views
+        self.load_data()
+        if archive_days is not None:
+            self.archive_sessions(archive_days, ARCHIVE_MIN_SESSIONS)
+        
+    @instrumented
+    @synchronized
+    def load_data(self):
+        """Load student data from file or initialize new"""
+        data = self.storage.load()
+        # Sessions, assignments and works are held as compact records (see
+        # records.py) with subjects interned to ids in self.subjects
+        self.subjects = SubjectTable()
+        # Keyed collections are id -> record maps in insertion order, which
+        # doubles as the lookup index; next_ids is the persisted id sequence
+        self.next_ids = dict(data.get('next_ids', {}))
+        self.assignments = self._index_records('assignments', data['assignments'])
+        self.works = self._index_records('works', data['works'])
+        self.projects = self._index_records('projects', data['projects'])
+        # Sessions archived out of the data file are only rollups until their
+        # segments are read on demand; the live study_log continues their numbering
+        self.archive = data.get('archive') or empty_archive()
+        self.archived = self.archive['sessions']
+        for subject, _, _ in self.archive['subjects']:
+            self.subjects.intern(subject)
+        self.study_log = [StudySession.from_dict(s, self.subjects) for s in data['study_log']]
+        self.timetable = data['timetable']
+        # Sorts every day's entries in place and indexes their start/end minutes
+        self.timetable_index = Timetable(self.timetable)
+        self.total_study_hours = data['total_study_hours']
+        self._rebuild_aggregates()
+        self._index_topics()
+        self._load_reviews(data.get('reviews'))
+        self.streak = self.get_current_streak()
+        # Commits per storage key, which tell the suggestion rules what changed
+        self.changes = Counter()
+        self.suggestion_engine = SuggestionEngine(self)
+        self.version = next(_versions)
+    
+    def _index_records(self, kind, records):
+        """Build the id index of a collection, giving fresh ids to missing or duplicate ones"""
+        index = {}
+        for record in records:
+            if record.get('id') in index or not isinstance(record.get('id'), int):
+                record['id'] = None
+            else:
+                index[record['id']] = record
+        next_id = max(index, default=0) + 1
+        self.next_ids[kind] = max(self.next_ids.get(kind, 1), next_id)
+        for record in records:
+            if record['id'] is None:
+                record['id'] = self._allocate_id(kind)
+                index[record['id']] = record
+        record_type = RECORD_TYPES.get(kind)
+        if record_type is not None:
+            subjects = self.subjects
+            index = {record_id: record_type.from_dict(record, subjects) for record_id, record in index.items()}
+        return index
+    
+    def _allocate_id(self, kind):
+        record_id = self.next_ids[kind]
+        self.next_ids[kind] = record_id + 1
+        return record_id
+    
+    def _next_ids_record(self):
+        return {'op': 'set', 'key': 'next_ids', 'value': dict(self.next_ids)}
+    
+    def _rebuild_aggregates(self):
+        """Recompute running aggregates once after loading"""
+        self.aggregates = {
+            'assignment_status': Counter(),
+            'completed_score_sum': 0.0,
+            'score_sum': 0.0,
+            'score_count': 0,
+            'works_completed': 0,
+            'subject_hours': defaultdict(float),
+            # Calendar index: day ordinal -> hours / sessions, per subject too.
+            # With NumPy the hour buckets live in self.calendar instead.
+            'day_hours': defaultdict(float),
+            'day_sessions': Counter(),
+            'subject_days': defaultdict(lambda: defaultdict(float)),
+        }
+        self.calendar = StudyCalendar() if HAVE_NUMPY else None
+        # Sorted once here, then kept up to date by _track
+        self.deadlines = DeadlineIndex(self._deadline_entries())
+        if hasattr(self.storage, 'aggregates'):
+            # SQL backends compute the same aggregates with GROUP BY queries
+            seed = self.storage.aggregates()
+            for key in ('assignment_status', 'completed_score_sum', 'score_sum',
+                        'score_count', 'works_completed'):
+                self.aggregates[key] += seed[key]
+            for day, subject, hours, sessions in self.archive['days'] + seed['session_buckets']:
+                self._track_study(day_ordinal(day), self.subjects.intern(subject), hours, sessions)
+            return
+        for assignment in self.assignments.values():
+            self._track_assignment(assignment)
+        for work in self.works.values():
+            self._track_work(work)
+        if self.calendar is None:
+            self._track_archive()
+            for session in self.study_log:
+                self._track_study(session.day, session.subject, session.hours)
+        else:
+            self._track_studies(self.study_log)
+    
+    def _track_assignment(self, assignment, sign=1):
+        """Add (sign=1) or remove (sign=-1) an assignment from the aggregates"""
+        agg = self.aggregates
+        agg['assignment_status'][assignment.status] += sign
+        score = assignment.score or 0
+        if assignment.status == 'Completed':
+            agg['completed_score_sum'] += sign * score
+        if score:
+            agg['score_sum'] += sign * score
+            agg['score_count'] += sign
+    
+    def _track_work(self, work, sign=1):
+        if work.completed:
+            self.aggregates['works_completed'] += sign
+    
+    def _deadline_entry(self, kind, record):
+        """(deadline ordinal, kind, id) of unfinished work, None once it is done"""
+        if kind == 'assignments':
+            if record.status != 'Completed':
+                return (record.deadline, kind, record.id)
+        elif record.get('status') != 'Completed' and record.get('progress', 0) < 100:
+            return (day_ordinal(record['deadline']), kind, record['id'])
+        return None
+    
+    def _deadline_entries(self):
+        for kind in ('assignments', 'projects'):
+            for record in getattr(self, kind).values():
+                entry = self._deadline_entry(kind, record)
+                if entry is not None:
+                    yield entry
+    
+    def _track(self, kind, record, sign=1):
+        """Add or remove any keyed record from the aggregates and the deadline index"""
+        if kind == 'assignments':
+            self._track_assignment(record, sign)
+        elif kind == 'works':
+            self._track_work(record, sign)
+        if kind != 'works':
+            entry = self._deadline_entry(kind, record)
+            if entry is not None and sign > 0:
+                self.deadlines.add(entry)
+            elif entry is not None:
+                self.deadlines.remove(entry)
+    
+    def _track_study(self, day, subject, hours, sessions=1):
+        """Add study time on a day ordinal to the subject id and calendar buckets"""
+        agg = self.aggregates
+        agg['subject_hours'][subject] += hours
+        agg['day_sessions'][day] += sessions
+        if self.calendar is not None:
+            self.calendar.add(day, subject, hours, sessions)
+        else:
+            agg['day_hours'][day] += hours
+            agg['subject_days'][subject][day] += hours
+    
+    def _track_archive(self):
+        """Seed the dict buckets with the archive rollups, which were summed in log order
+        so the live sessions added on top give the same totals as the whole log would"""
+        agg, subjects = self.aggregates, self.subjects
+        for subject, hours, _ in self.archive['subjects']:
+            agg['subject_hours'][subjects.lookup(subject)] = hours
+        for day, hours in self.archive['daily']:
+            agg['day_hours'][day_ordinal(day)] = hours
+        for day, subject, hours, sessions in self.archive['days']:
+            day = day_ordinal(day)
+            agg['day_sessions'][day] += sessions
+            agg['subject_days'][subjects.lookup(subject)][day] = hours
+    
+    def _track_studies(self, sessions):
+        """_track_study for the archive rollups and a whole study log at once,
+        grouped by the NumPy calendar"""
+        agg, cells = self.aggregates, self.archive['days']
+        days = [session.day for session in sessions]
+        subjects = [session.subject for session in sessions]
+        hours = [session.hours for session in sessions]
+        counts = None
+        if cells:
+            # Rollups go first, so each day's sum continues from them in log order
+            days = [day_ordinal(day) for day, _, _, _ in cells] + days
+            subjects = [self.subjects.lookup(subject) for _, subject, _, _ in cells] + subjects
+            hours = [total for _, _, total, _ in cells] + hours
+            counts = [count for _, _, _, count in cells] + [1] * len(sessions)
+            for day, _, _, count in cells:
+                agg['day_sessions'][day_ordinal(day)] += count
+        self.calendar.add_many(days, subjects, hours, counts)
+        agg['day_sessions'].update(session.day for session in sessions)
+        subjects, totals = self.calendar.subject_hours()
+        for subject, total in zip(subjects.tolist(), totals.tolist()):
+            agg['subject_hours'][subject] += total
+    
+    def _index_topics(self):
+        """Topic index of the live sessions, numbered on from the archived ones,
+        with the topic stats of the archive folded in"""
+        self.topic_index = TopicIndex()
+        for subject, topic, sessions, hours, first, last in self.archive['topics']:
+            self.topic_index.add_stats(self.subjects.intern(subject), topic, sessions, hours,
+                                       day_ordinal(first), day_ordinal(last))
+        self.topic_index.add_many(self.study_log, self.archived)
+    
+    def _load_reviews(self, items):
+        """Load the review schedule, seeding it from the study history the first time"""
+        self.reviews = ReviewScheduler(items)
+        # Set until the whole schedule has been written once (see _review_records)
+        self.reviews_unsaved = False
+        if not self.reviews and self.study_log:
+            for session in sorted(self.study_log, key=lambda session: session.time):
+                self._review_session(session)
+            self.reviews_unsaved = bool(self.reviews)
+    
+    def _review_session(self, session):
+        """Credit every topic of a study session as a review; returns the changed keys"""
+        subject = self.subjects.name(session.subject)
+        keys = (self.reviews.review(subject, topic, session.day, SESSION_QUALITY)
+                for topic in parse_topics(session.topics))
+        return [key for key in keys if key is not None]
+    
+    def _review_records(self, keys):
+        """Storage records for changed review items (the whole schedule if never saved)"""
+        if self.reviews_unsaved:
+            self.reviews_unsaved = False
+            return [{'op': 'set', 'key': 'reviews', 'value': self.reviews.items}]
+        items = self.reviews.items
+        return [{'op': 'put', 'key': 'reviews', 'id': key, 'value': items[key]} for key in dict.fromkeys(keys)]
+    
+    def _snapshot(self):
+        snapshot = {
+            'assignments': self.get_records('assignments'),
+            'works': self.get_records('works'),
+            'projects': self.get_records('projects'),
+            'study_log': self.get_records('study_log'),
+            'timetable': self.timetable,
+            'reviews': self.reviews.items,
+            'streak': self.streak,
+            'total_study_hours': self.total_study_hours,
+            'next_ids': self.next_ids
+        }
+        if self.archived:
+            snapshot['archive'] = self.archive
+        return snapshot
+    
+    @instrumented
+    @synchronized
+    @synchronized
+    def save_data(self):
+        """Save all student data to file. A whole-file save would undo what other
+        processes wrote since we loaded, so those writes are loaded in first"""
+        self.flush()
+        with self.storage.locked():
+            if self.storage.stale():
+                self.load_data()
+            self.storage.save(self._snapshot())
+        self.reviews_unsaved = False
+    
+    def _commit(self, *records):
+        """Persist mutations already applied in memory"""
+        self.version = next(_versions)
+        self.changes.update(record.get('key', record['op']) for record in records)
+        self.storage.commit(records, self._snapshot)
+        self._reload_if_merged()
+    
+    def _reload_if_merged(self):
+        # Another process wrote the data file since we loaded it, so the
+        # storage merged our records into its version: catch up with that
+        if self.storage.merged:
+            self.storage.merged = False
+            self.load_data()
+    
+    @synchronized
+    def flush(self):
+        """Write changes held back by defer_writes; returns the number of records written"""
+        if not isinstance(self.storage, DeferredStorage):
+            return 0
+        written = self.storage.flush()
+        self._reload_if_merged()
+        return written
+    
+    def compact(self):
+        """Fold any pending journal into a fresh snapshot"""
+        self.save_data()
+    
+    @instrumented
+    @synchronized
+    def archive_sessions(self, days=ARCHIVE_DAYS, min_sessions=1):
+        """Move sessions older than `days` days out of the data file: they are kept as
+        rollups (so analytics do not change) and a compressed segment file that
+        load_history() reads back. Only the oldest stretch of the log is archived,
+        which keeps every session at its position."""
+        _check_number('days', days, 0)
+        self.flush()
+        with self.storage.locked():
+            # Decided and saved under the storage lock, on what other processes last wrote
+            if self.storage.stale():
+                self.load_data()
+            cutoff = date.today().toordinal() - days
+            count = 0
+            for session in self.study_log:
+                if session.day >= cutoff:
+                    break
+                count += 1
+            if not count:
+                return f"No sessions older than {days} days to archive"
+            if count < min_sessions:
+                return f"Only {count} sessions older than {days} days, not archived"
+            sessions = self.study_log[:count]
+            # Segment first: a crash before the data file is saved only leaves an unused segment
+            path = segment_file(self.data_file, self.archived)
+            write_segment(path, sessions, self.subjects)
+            add_sessions(self.archive, sessions, self.subjects)
+            self.archive['segments'].append({
+                'file': os.path.basename(path), 'start': self.archived, 'sessions': count,
+                'first': day_text(min(session.day for session in sessions)),
+                'last': day_text(max(session.day for session in sessions)),
+            })
+            del self.study_log[:count]
+            self.archived += count
+            self._index_topics()
+            self.save_data()
+        if hasattr(self.storage, 'vacuum'):
+            self.storage.vacuum()
+        self.version = next(_versions)
+        return f"Archived {count} sessions from before {day_text(cutoff)}"
+    
+    @synchronized
+    def load_history(self):
+        """Archived sessions, oldest first, read from their segment files. They are not
+        kept, so each call reads them again and the memory archiving freed stays free"""
+        return list(self._iter_history())
+    
+    def _iter_history(self):
+        folder = os.path.dirname(self.data_file)
+        for segment in self.archive['segments']:
+            yield from read_segment(os.path.join(folder, segment['file']), self.subjects)
+    
+    def _sessions(self, history=False):
+        """The live study log, or with history=True every session ever logged, the
+        archived ones streamed one segment at a time"""
+        if history and self.archived:
+            return chain(self._iter_history(), self.study_log)
+        return self.study_log
+    
+    @synchronized
+    def get_session_count(self):
+        """Sessions logged, archived ones included"""
+        return self.archived + len(self.study_log)
+    
+    @instrumented
+    @synchronized
+    def add_assignment(self, title, subject, deadline_days, difficulty="Medium"):
+        """Add new assignment"""
+        _check_number('deadline_days', deadline_days, -MAX_DEADLINE_DAYS, MAX_DEADLINE_DAYS)
+        if difficulty not in FIELD_CHOICES['difficulty']:
+            raise ValueError(f"difficulty must be one of {', '.join(FIELD_CHOICES['difficulty'])}")
+        now = datetime.now()
+        assignment = Assignment(
+            self._allocate_id('assignments'), title, self.subjects.intern(subject),
+            (now + timedelta(days=deadline_days)).toordinal(), difficulty, 'Pending', now_seconds(now)
+        )
+        self.assignments[assignment.id] = assignment
+        self._track('assignments', assignment)
+        self._commit(
+            {'op': 'append', 'key': 'assignments', 'value': assignment.to_dict(self.subjects)},
+            self._next_ids_record()
+        )
+        return f"Assignment '{title}' added successfully!"
+    
+    @instrumented
+    @synchronized
+    def add_work(self, title, subject, duration_hours, completed=False):
+        """Add classwork/homework"""
+        _check_number('duration_hours', duration_hours, 0)
+        now = datetime.now()
+        work = Work(
+            self._allocate_id('works'), title, self.subjects.intern(subject), duration_hours,
+            completed, now.toordinal(), now_seconds(now)
+        )
+        self.works[work.id] = work
+        self._track_work(work)
+        self._commit(
+            {'op': 'append', 'key': 'works', 'value': work.to_dict(self.subjects)},
+            self._next_ids_record()
+        )
+        return f"Work '{title}' added successfully!"
+    
+    @instrumented
+    @synchronized
+    def add_project(self, title, description, deadline_days, status="In Progress"):
+        """Add project"""
+        _check_number('deadline_days', deadline_days, -MAX_DEADLINE_DAYS, MAX_DEADLINE_DAYS)
+        deadline = (datetime.now() + timedelta(days=deadline_days)).strftime("%Y-%m-%d")
+        project = {
+            'id': self._allocate_id('projects'),
+            'title': title,
+            'description': description,
+            'deadline': deadline,
+            'status': status,
+            'progress': 0,
+            'created_date': datetime.now().strftime("%Y-%m-%d")
+        }
+        self.projects[project['id']] = project
+        self._track('projects', project)
+        self._commit({'op': 'append', 'key': 'projects', 'value': project}, self._next_ids_record())
+        return f"Project '{title}' added successfully!"
+    
+    @instrumented
+    @synchronized
+    def log_study_session(self, subject, duration_hours, topics_covered):
+        """Log study session"""
+        _check_number('duration_hours', duration_hours, 0, positive=True)
+        now = datetime.now()
+        session = StudySession(
+            now.toordinal(), now_seconds(now), self.subjects.intern(subject), duration_hours, topics_covered
+        )
+        self.study_log.append(session)
+        self.topic_index.add(self.archived + len(self.study_log) - 1, session)
+        self._track_study(session.day, session.subject, duration_hours)
+        self.total_study_hours += duration_hours
+        self.update_streak()
+        self._commit(
+            {'op': 'append', 'key': 'study_log', 'value': session.to_dict(self.subjects)},
+            {'op': 'set', 'key': 'total_study_hours', 'value': self.total_study_hours},
+            {'op': 'set', 'key': 'streak', 'value': self.streak},
+            *self._review_records(self._review_session(session))
+        )
+        return f"Study session logged: {duration_hours}h on {subject}"
+    
+    @instrumented
+    @synchronized
+    def add_timetable_entry(self, day, time, subject, duration, allow_overlap=False):
+        """Add timetable entry, refusing one that overlaps another unless allow_overlap"""
+        try:
+            start = parse_time(time)
+        except ValueError:
+            return f"Invalid time {time}, use HH:MM"
+        if duration > DAY_MINUTES / 60:
+            return "Entries must end by midnight"
+        end = start + round(duration * 60)
+        if end <= start:
+            return "Duration must be positive"
+        if end > DAY_MINUTES:
+            return "Entries must end by midnight"
+        clash = self.timetable_index.plan(day).conflict(start, end)
+        if clash is not None and not allow_overlap:
+            return f"Overlaps {clash['subject']} at {clash['time']} on {day}, choose another time"
+        entry = {'time': time, 'subject': subject, 'duration': duration}
+        self.timetable_index.add(day, entry)
+        self._commit({'op': 'timetable', 'day': day, 'value': entry})
+        if clash is not None:
+            return f"Timetable updated for {day} (overlaps {clash['subject']} at {clash['time']})"
+        return f"Timetable updated for {day}"
+    
+    @instrumented
+    @synchronized
+    def remove_timetable_entry(self, day, time):
+        """Remove the entry starting at a time on a day"""
+        try:
+            entry = self.timetable_index.remove(day, parse_time(time))
+        except ValueError:
+            entry = None
+        if entry is None:
+            return f"No entry at {time} on {day}"
+        self._commit(self._timetable_remove_record(day, entry))
+        return f"Removed {entry['subject']} at {entry['time']} on {day}"
+    
+    @staticmethod
+    def _timetable_remove_record(day, entry):
+        record = {'op': 'timetable_remove', 'day': day, 'time': entry['time']}
+        if entry.get('assignment') is not None:
+            # Blocks booked by schedule_assignments are told apart by their assignment id
+            record['assignment'] = entry['assignment']
+        return record
+    
+    def _unschedule(self, assignment_id):
+        """Take the blocks schedule_assignments booked for an assignment out of the
+        timetable; returns the records to commit"""
+        records = []
+        for day, entries in list(self.timetable.items()):
+            for entry in [entry for entry in entries if entry.get('assignment') == assignment_id]:
+                self.timetable_index.remove(day, parse_time(entry['time']), entry)
+                records.append(self._timetable_remove_record(day, entry))
+        return records
+    
+    def _validate_rows(self, rows, validate):
+        """Records built from all rows and the errors of the rejected ones. Every row is
+        validated before an importer applies the first, so a bad row cannot leave
+        an import half done"""
+        records, errors = [], []
+        for line, row in enumerate(rows, 1):
+            try:
+                if not isinstance(row, dict):
+                    raise TypeError(f"expected an object, not {type(row).__name__}")
+                records.append(validate(row))
+            except (ValueError, TypeError) as e:
+                errors.append(f"row {line}: {e}")
+        return records, errors
+    
+    def _session_from_row(self, row):
+        """Validate an imported study session row"""
+        day = _day(row, 'date', datetime.now().strftime("%Y-%m-%d"))
+        hours = float(_text(row, 'duration_hours'))
+        if not math.isfinite(hours):
+            raise ValueError("duration_hours must be a finite number")
+        if hours <= 0:
+            raise ValueError("duration_hours must be positive")
+        return StudySession.from_dict({
+            'date': day,
+            'timestamp': _text(row, 'timestamp', f"{day} 00:00:00"),
+            'subject': _text(row, 'subject'),
+            'duration_hours': hours,
+            'topics': _topics(row)
+        }, self.subjects)
+    
+    def _assignment_from_row(self, row):
+        """Validate an imported assignment row"""
+        status = _text(row, 'status', 'Pending')
+        if status not in ('Pending', 'Completed'):
+            raise ValueError(f"unknown status {status}")
+        difficulty = _text(row, 'difficulty', 'Medium')
+        if difficulty not in ('Easy', 'Medium', 'Hard'):
+            raise ValueError(f"unknown difficulty {difficulty}")
+        assignment = {
+            'title': _text(row, 'title'),
+            'subject': _text(row, 'subject'),
+            'deadline': _day(row, 'deadline'),
+            'difficulty': difficulty,
+            'status': status,
+            'created_date': _text(row, 'created_date', datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        }
+        if status == 'Completed':
+            score = float(_text(row, 'score'))
+            if not 0 <= score <= 100:
+                raise ValueError("score must be between 0 and 100")
+            assignment['score'] = score
+            assignment['completion_date'] = _day(row, 'completion_date', assignment['deadline'])
+        return Assignment.from_dict(assignment, self.subjects)
+    
+    def _work_from_row(self, row):
+        """Validate an imported work row"""
+        day = _day(row, 'date', datetime.now().strftime("%Y-%m-%d"))
+        hours = float(_text(row, 'duration_hours'))
+        if not math.isfinite(hours):
+            raise ValueError("duration_hours must be a finite number")
+        if hours < 0:
+            raise ValueError("duration_hours must not be negative")
+        return Work.from_dict({
+            'title': _text(row, 'title'),
+            'subject': _text(row, 'subject'),
+            'duration_hours': hours,
+            'completed': _flag(row.get('completed', False)),
+            'date': day,
+            'timestamp': _text(row, 'timestamp', f"{day} 00:00:00")
+        }, self.subjects)
+    
+    @instrumented
+    @synchronized
+    def import_study_sessions(self, rows):
+        """Validate and log many study sessions with a single save"""
+        sessions, errors = self._validate_rows(rows, self._session_from_row)
+        records, reviewed = [], []
+        before = len(self.study_log)
+        added_hours = 0.0
+        for session in sessions:
+            self.study_log.append(session)
+            self.topic_index.add(self.archived + len(self.study_log) - 1, session)
+            self._track_study(session.day, session.subject, session.hours)
+            added_hours += session.hours
+            reviewed.extend(self._review_session(session))
+            records.append({'op': 'append', 'key': 'study_log', 'value': session.to_dict(self.subjects)})
+        if records:
+            self.total_study_hours += added_hours
+            self.update_streak()
+            records.append({'op': 'set', 'key': 'total_study_hours', 'value': self.total_study_hours})
+            records.append({'op': 'set', 'key': 'streak', 'value': self.streak})
+            records.extend(self._review_records(reviewed))
+            self._commit(*records)
+        return {'imported': len(self.study_log) - before, 'errors': errors}
+    
+    @instrumented
+    @synchronized
+    def import_assignments(self, rows):
+        """Validate and add many assignments with a single save"""
+        assignments, errors = self._validate_rows(rows, self._assignment_from_row)
+        records = []
+        for assignment in assignments:
+            assignment.id = self._allocate_id('assignments')
+            self.assignments[assignment.id] = assignment
+            self._track('assignments', assignment)
+            records.append({'op': 'append', 'key': 'assignments', 'value': assignment.to_dict(self.subjects)})
+        if records:
+            self._commit(*records, self._next_ids_record())
+        return {'imported': len(records), 'errors': errors}
+    
+    @instrumented
+    @synchronized
+    def import_works(self, rows):
+        """Validate and add many works with a single save"""
+        works, errors = self._validate_rows(rows, self._work_from_row)
+        records = []
+        for work in works:
+            work.id = self._allocate_id('works')
+            self.works[work.id] = work
+            self._track_work(work)
+            records.append({'op': 'append', 'key': 'works', 'value': work.to_dict(self.subjects)})
+        if records:
+            self._commit(*records, self._next_ids_record())
+        return {'imported': len(records), 'errors': errors}
+    
+    def import_records(self, kind, stream, fmt="csv"):
+        """Bulk import 'study_log', 'assignments' or 'works' from a CSV/JSONL stream"""
+        importers = {
+            'study_log': self.import_study_sessions,
+            'assignments': self.import_assignments,
+            'works': self.import_works,
+        }
+        return importers[kind](read_records(stream, fmt))
+    
+    @instrumented
+    @synchronized
+    def export_records(self, kind, stream, fmt="jsonl", history=True):
+        """Stream one collection to a text stream as CSV or JSON Lines (study sessions
+        including the archived ones unless history=False)"""
+        fields = RECORD_FIELDS[kind]
+        records = self._dicts(kind, history)
+        if fmt == "csv":
+            writer = csv.DictWriter(stream, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+        elif fmt == "jsonl":
+            for record in records:
+                stream.write(json.dumps(record, separators=(',', ':')) + '\n')
+        else:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if kind == 'study_log' and history:
+            return self.get_session_count()
+        return len(self._records(kind))
+    
+    @instrumented
+    @synchronized
+    def query_records(self, kind, subject=None, status=None, start_date=None, end_date=None,
+                      sort_by=None, descending=False, limit=50, offset=0, history=False):
+        """Return one page of a collection, filtered and sorted, with the total match count
+        (history=True includes archived study sessions)"""
+        date_field, default_sort = QUERY_FIELDS[kind]
+        sort_by = sort_by or default_sort
+        start = start_date.strftime("%Y-%m-%d") if start_date else None
+        end = end_date.strftime("%Y-%m-%d") if end_date else None
+        # Archived sessions are not in the database, so they are queried in memory
+        history = history and kind == 'study_log' and self.archived
+        
+        if hasattr(self.storage, 'query') and not history:
+            # SQL backends filter, sort and page with indexed queries
+            records, total = self.storage.query(
+                kind, subject, status, date_field, start, end, sort_by, descending, limit, offset
+            )
+        else:
+            record_type = RECORD_TYPES.get(kind)
+            if record_type is None:
+                # Projects are plain dicts with "%Y-%m-%d" dates
+                def field(record, name):
+                    return record.get(name)
+                subject_key, low, high = subject, start, end
+            else:
+                # Compact records compare subject ids and day ordinals
+                attrs = record_type.FIELDS
+                
+                def field(record, name):
+                    attr = attrs.get(name)
+                    return getattr(record, attr) if attr else None
+                subject_key = None if subject is None else self.subjects.lookup(subject)
+                if subject is not None and subject_key is None:
+                    subject_key = -1  # never seen, matches nothing
+                low = start_date.toordinal() if start_date else None
+                high = end_date.toordinal() if end_date else None
+            
+            def matches(record):
+                if subject is not None and field(record, 'subject') != subject_key:
+                    return False
+                if status is not None:
+                    if kind == 'works':
+                        if field(record, 'completed') != (status == 'Completed'):
+                            return False
+                    elif field(record, 'status') != status:
+                        return False
+                day = field(record, date_field)
+                return (low is None or day >= low) and (high is None or day <= high)
+            
+            def sort_key(record):
+                # Records without the sort field go last in either direction
+                value = field(record, sort_by)
+                if sort_by == 'subject' and record_type is not None:
+                    value = self.subjects.name(value)
+                return ((value is None) != descending, value if value is not None else 0)
+            
+            collection = self._sessions(history) if kind == 'study_log' else self._records(kind)
+            if subject is None and status is None and start is None and end is None:
+                matched = list(collection) if history else collection
+            else:
+                matched = [record for record in collection if matches(record)]
+            total = len(matched)
+            # Only the first offset + limit records need ordering
+            select = heapq.nlargest if descending else heapq.nsmallest
+            records = select(offset + limit, matched, key=sort_key)[offset:]
+            if record_type is not None:
+                records = [record.to_dict(self.subjects) for record in records]
+            else:
+                records = [dict(record) for record in records]
+        
+        next_offset = offset + limit if offset + limit < total else None
+        return {'records': records, 'total': total, 'offset': offset, 'next_offset': next_offset}
+    
+    def update_streak(self):
+        """Update study streak based on daily activity"""
+        self.streak = self.get_current_streak()
+    
+    @synchronized
+    def get_current_streak(self):
+        """Count consecutive study days ending today (or yesterday if not yet today)"""
+        day_sessions = self.aggregates['day_sessions']
+        day = date.today().toordinal()
+        if not day_sessions.get(day):
+            day -= 1
+        streak = 0
+        while day_sessions.get(day):
+            streak += 1
+            day -= 1
+        return streak
+    
+    def _window(self, days, end_date=None):
+        """Day ordinals of the `days`-day window ending at end_date (default today)"""
+        end = (end_date or date.today()).toordinal()
+        return range(end - days + 1, end + 1)
+    
+    @synchronized
+    def get_daily_series(self, days=RECENT_DAYS, end_date=None):
+        """(dates, hours) of a rolling window, oldest first; hours is an array with NumPy"""
+        window = self._window(days, end_date)
+        dates = [day_text(day) for day in window]
+        if self.calendar is not None:
+            return dates, self.calendar.daily_totals(window.start, window.stop - 1)
+        day_hours = self.aggregates['day_hours']
+        return dates, [day_hours.get(day, 0.0) for day in window]
+    
+    @synchronized
+    def get_daily_hours(self, days=RECENT_DAYS, end_date=None):
+        """Study hours for each day of a rolling window, oldest first"""
+        dates, hours = self.get_daily_series(days, end_date)
+        return dict(zip(dates, map(float, hours)))
+    
+    @synchronized
+    def get_hours_between(self, start_date, end_date, subject=None):
+        """Total study hours between two dates (inclusive), optionally for one subject"""
+        start, end = start_date.toordinal(), end_date.toordinal()
+        subject_id = None if subject is None else self.subjects.lookup(subject)
+        if subject is not None and subject_id is None:
+            return 0
+        if self.calendar is not None:
+            return self.calendar.total(start, end, subject_id)
+        if subject is None:
+            buckets = self.aggregates['day_hours']
+        else:
+            buckets = self.aggregates['subject_days'].get(subject_id, {})
+        return sum(buckets.get(day, 0.0) for day in range(start, end + 1))
+    
+    @synchronized
+    def get_subject_series(self, days=None, end_date=None):
+        """(subjects, hours) studied all time or over a rolling window of days"""
+        names = self.subjects.names
+        if days is None:
+            subject_hours = self.aggregates['subject_hours']
+            return [names[subject] for subject in subject_hours], list(subject_hours.values())
+        window = self._window(days, end_date)
+        if self.calendar is not None:
+            subjects, hours = self.calendar.subject_hours(window.start, window.stop - 1)
+            return [names[subject] for subject in subjects.tolist()], hours
+        subjects, hours = [], []
+        for subject, buckets in self.aggregates['subject_days'].items():
+            studied = [buckets[day] for day in window if day in buckets]
+            if studied:
+                subjects.append(names[subject])
+                hours.append(sum(studied))
+        return subjects, hours
+    
+    @synchronized
+    def get_subject_hours(self, days=None, end_date=None):
+        """Study hours per subject, all time or over a rolling window of days"""
+        subjects, hours = self.get_subject_series(days, end_date)
+        return dict(zip(subjects, map(float, hours)))
+    
+    @synchronized
+    def get_least_studied_subject(self, days=RECENT_DAYS, end_date=None):
+        """Subject with the fewest hours among those studied in the window, or None"""
+        subjects, hours = self.get_subject_series(days, end_date)
+        if not subjects:
+            return None
+        if self.calendar is not None:
+            return subjects[int(hours.argmin())]
+        return subjects[hours.index(min(hours))]
+    
+    @instrumented
+    @synchronized
+    def complete_assignment(self, assignment_id, score):
+        """Mark assignment complete"""
+        _check_number('score', score, 0, 100)
+        assignment = self.assignments.get(assignment_id)
+        if assignment is None:
+            return "Assignment not found"
+        self._track('assignments', assignment, -1)
+        assignment.status = 'Completed'
+        assignment.score = score
+        assignment.completed_on = date.today().toordinal()
+        self._track('assignments', assignment)
+        self._commit({
+            'op': 'update', 'key': 'assignments', 'id': assignment_id,
+            'value': {'status': 'Completed', 'score': score, 'completion_date': day_text(assignment.completed_on)}
+        }, *self._unschedule(assignment_id))
+        return f"Assignment marked complete with score: {score}%"
+    
+    def _records(self, kind):
+        """Records of a collection in insertion order"""
+        collection = getattr(self, kind)
+        return collection.values() if kind in KEYED_COLLECTIONS else collection
+    
+    def _dicts(self, kind, history=False):
+        """Records of a collection as the plain dicts stored in student_data.json"""
+        records = self._sessions(history) if kind == 'study_log' else self._records(kind)
+        if kind not in RECORD_TYPES:
+            return (dict(record) for record in records)
+        subjects = self.subjects
+        return (record.to_dict(subjects) for record in records)
+    
+    @synchronized
+    def get_records(self, kind):
+        """List of a collection's records as dicts, e.g. for building a DataFrame"""
+        return list(self._dicts(kind))
+    
+    @synchronized
+    def get_record(self, kind, record_id):
+        """Look up an assignment, work or project by id (as a dict)"""
+        record = getattr(self, kind).get(record_id)
+        if record is None:
+            return None
+        if kind not in RECORD_TYPES:
+            return dict(record)
+        return record.to_dict(self.subjects)
+    
+    @instrumented
+    @synchronized
+    def update_record(self, kind, record_id, **fields):
+        """Change fields of an assignment, work or project by id"""
+        _check_fields(kind, fields)
+        label = KEYED_COLLECTIONS[kind]
+        record = getattr(self, kind).get(record_id)
+        if record is None:
+            return f"{label} not found"
+        if kind in RECORD_TYPES:
+            data = record.to_dict(self.subjects)
+            data.update(fields)
+            updated = RECORD_TYPES[kind].from_dict(data, self.subjects)
+        else:
+            updated = {**record, **fields}
+        self._track(kind, record, -1)
+        getattr(self, kind)[record_id] = updated
+        self._track(kind, updated)
+        records = [{'op': 'update', 'key': kind, 'id': record_id, 'value': fields}]
+        if kind == 'assignments' and updated.status == 'Completed':
+            records.extend(self._unschedule(record_id))
+        self._commit(*records)
+        return f"{label} {record_id} updated"
+    
+    @instrumented
+    @synchronized
+    def delete_record(self, kind, record_id):
+        """Remove an assignment, work or project by id"""
+        label = KEYED_COLLECTIONS[kind]
+        record = getattr(self, kind).pop(record_id, None)
+        if record is None:
+            return f"{label} not found"
+        self._track(kind, record, -1)
+        records = self._unschedule(record_id) if kind == 'assignments' else []
+        self._commit({'op': 'delete', 'key': kind, 'id': record_id}, *records)
+        return f"{label} {record_id} deleted"
+    
+    def get_assignment(self, assignment_id):
+        return self.get_record('assignments', assignment_id)
+    
+    def update_assignment(self, assignment_id, **fields):
+        return self.update_record('assignments', assignment_id, **fields)
+    
+    def delete_assignment(self, assignment_id):
+        return self.delete_record('assignments', assignment_id)
+    
+    def get_work(self, work_id):
+        return self.get_record('works', work_id)
+    
+    def update_work(self, work_id, **fields):
+        return self.update_record('works', work_id, **fields)
+    
+    def delete_work(self, work_id):
+        return self.delete_record('works', work_id)
+    
+    def get_project(self, project_id):
+        return self.get_record('projects', project_id)
+    
+    def update_project(self, project_id, **fields):
+        return self.update_record('projects', project_id, **fields)
+    
+    def delete_project(self, project_id):
+        return self.delete_record('projects', project_id)
+    
+    def update_project_progress(self, project_id, progress):
+        """Set a project's progress percentage"""
+        if not 0 <= progress <= 100:
+            return "Progress must be between 0 and 100"
+        return self.update_record('projects', project_id, progress=progress)
+    
+    @instrumented
+    @synchronized
+    def search_sessions(self, query, subject=None, limit=50, offset=0, history=False):
+        """Study sessions whose topics contain every word of the query (words may be
+        prefixes), most recently logged first, with the total number of matches.
+        Archived sessions are searched too with history=True."""
+        ids = self.topic_index.search(query)
+        first = self.archived
+        sessions = self.study_log
+        if history and self.archived:
+            # Indexed for this search only; archived ids are all older than the live ones
+            sessions = list(self._sessions(history))
+            index = TopicIndex()
+            index.add_many(sessions[:self.archived])
+            ids += index.search(query)
+            first = 0
+        if subject is not None:
+            subject_id = self.subjects.lookup(subject)
+            ids = [i for i in ids if sessions[i - first].subject == subject_id]
+        return {
+            'records': [sessions[i - first].to_dict(self.subjects) for i in ids[offset:offset + limit]],
+            'total': len(ids)
+        }
+    
+    @synchronized
+    def get_topic_stats(self, subject=None, sort_by='sessions', limit=None):
+        """How often, how long and when each topic was studied, overall or for one subject"""
+        if sort_by not in TOPIC_SORTS:
+            raise ValueError(f"Cannot sort topics by {sort_by}")
+        if subject is None:
+            stats = self.topic_index.stats
+        else:
+            stats = self.topic_index.subject_stats.get(self.subjects.lookup(subject), {})
+        column = TOPIC_SORTS[sort_by]
+        
+        def rank(item):
+            return item[1][column]
+        
+        if limit is None:
+            ranked = sorted(stats.items(), key=rank, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, stats.items(), key=rank)
+        return [
+            {'topic': topic, 'sessions': sessions, 'hours': hours,
+             'first_studied': day_text(first), 'last_studied': day_text(last)}
+            for topic, (sessions, hours, first, last) in ranked
+        ]
+    
+    @synchronized
+    def get_topic_breakdown(self, top=5):
+        """Most studied topics of every subject"""
+        return {
+            self.subjects.name(subject_id): [
+                topic for topic, _ in heapq.nlargest(top, stats.items(), key=lambda item: item[1][0])
+            ]
+            for subject_id, stats in self.topic_index.subject_stats.items()
+        }
+    
+    @synchronized
+    def get_free_slots(self, day, min_hours=1.0):
+        """Free stretches of at least min_hours between STUDY_START and STUDY_END on a day"""
+        plan = self.timetable_index.days.get(day)
+        gaps = plan.gaps() if plan is not None else [(STUDY_START, STUDY_END)]
+        return [
+            {'start': time_text(start), 'end': time_text(end), 'hours': (end - start) / 60}
+            for start, end in gaps if end - start >= min_hours * 60
+        ]
+    
+    @synchronized
+    def get_weekly_load(self):
+        """Timetabled hours per subject over the week, largest first"""
+        return {subject: minutes / 60 for subject, minutes in self.timetable_index.load.most_common()}
+    
+    @synchronized
+    def get_timetable_conflicts(self):
+        """Overlapping entries, as (day, entry, entry) tuples"""
+        return [(day, dict(first), dict(second)) for day, first, second in self.timetable_index.conflicts()]
+    
+    @synchronized
+    def get_timetable(self):
+        """Copy of the timetable, day -> entries sorted by start time"""
+        return {day: [dict(entry) for entry in entries] for day, entries in self.timetable.items()}
+    
+    @synchronized
+    def get_next_entry(self, now=None):
+        """The timetable entry in progress, or else the next one to start"""
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        found = self.timetable_index.upcoming(now.weekday(), minute)
+        if found is None:
+            return None
+        ahead, entry, start, end = found
+        return dict(
+            entry,
+            day=DAYS[(now.weekday() + ahead) % len(DAYS)],
+            end=time_text(end),
+            in_progress=ahead == 0 and start <= minute,
+            starts_in_minutes=ahead * DAY_MINUTES + start - minute
+        )
+    
+    @instrumented
+    @synchronized
+    def schedule_assignments(self, apply=False, limit=50, now=None):
+        """Plan the most pressing pending assignments into free timetable slots.
+
+        Assignments take SCHEDULE_HOURS by difficulty and are placed earliest
+        deadline first, each in the earliest free slot of the coming week
+        that is not after its deadline. With apply=True the slots are added
+        to the timetable, tagged with the assignment id; assignments that
+        already have a block are left out (listed as already_scheduled),
+        and the block goes again once the assignment is completed or deleted.
+        """
+        now = now or datetime.now()
+        today = now.toordinal()
+        booked = {entry['assignment'] for entries in self.timetable.values() for entry in entries
+                  if entry.get('assignment') is not None}
+        pending = islice((record_id for _, kind, record_id in self.deadlines.entries
+                          if kind == 'assignments' and record_id not in booked), limit)
+        tasks = []
+        for record_id in pending:
+            assignment = self.assignments[record_id]
+            tasks.append((round(SCHEDULE_HOURS.get(assignment.difficulty, 1.5) * 60),
+                          assignment.deadline - today, record_id))
+        placed, unplaced = self.timetable_index.schedule(tasks, now.weekday(), now.hour * 60 + now.minute)
+        scheduled, records = [], []
+        for record_id, ahead, start, end in placed:
+            assignment = self.assignments[record_id]
+            day = DAYS[(now.weekday() + ahead) % len(DAYS)]
+            entry = {'time': time_text(start), 'subject': self.subjects.name(assignment.subject),
+                     'duration': (end - start) / 60, 'note': assignment.title, 'assignment': record_id}
+            scheduled.append(dict(entry, id=record_id, day=day, date=day_text(today + ahead)))
+            if apply:
+                self.timetable_index.add(day, entry)
+                records.append({'op': 'timetable', 'day': day, 'value': entry})
+        if records:
+            self._commit(*records)
+        return {
+            'scheduled': scheduled,
+            'unscheduled': [{'id': record_id, 'title': self.assignments[record_id].title}
+                            for record_id in unplaced],
+            'already_scheduled': [{'id': record_id, 'title': self.assignments[record_id].title}
+                                  for record_id in sorted(booked) if record_id in self.assignments]
+        }
+    
+    def _deadline_items(self, entries):
+        """Deadline index entries as dicts for display"""
+        today = date.today().toordinal()
+        items = []
+        for deadline, kind, record_id in entries:
+            record = getattr(self, kind)[record_id]
+            if kind == 'assignments':
+                title, subject, difficulty = record.title, self.subjects.name(record.subject), record.difficulty
+            else:
+                title, subject, difficulty = record['title'], None, None
+            items.append({
+                'kind': kind, 'id': record_id, 'title': title, 'subject': subject,
+                'difficulty': difficulty, 'deadline': day_text(deadline), 'days_left': deadline - today
+            })
+        return items
+    
+    @synchronized
+    def get_overdue(self, limit=None):
+        """Unfinished assignments and projects past their deadline, most overdue first"""
+        return self._deadline_items(self.deadlines.overdue(date.today().toordinal(), limit))
+    
+    @synchronized
+    def get_next_due(self, n=5):
+        """The n unfinished assignments and projects due soonest from today on"""
+        return self._deadline_items(self.deadlines.next_due(date.today().toordinal(), n))
+    
+    @synchronized
+    def get_due_within(self, days):
+        """Unfinished assignments and projects due between today and `days` days from now"""
+        return self._deadline_items(self.deadlines.due_within(date.today().toordinal(), days))
+    
+    def _urgency_lead(self, entry):
+        _, kind, record_id = entry
+        if kind == 'assignments':
+            return URGENCY_LEAD_DAYS.get(self.assignments[record_id].difficulty, 1)
+        return URGENCY_LEAD_DAYS['Medium']
+    
+    @synchronized
+    def get_urgent_work(self, n=5):
+        """The n most urgent unfinished items, by deadline brought forward by difficulty"""
+        entries = self.deadlines.most_urgent(n, self._urgency_lead, max(URGENCY_LEAD_DAYS.values()))
+        return self._deadline_items(entries)
+    
+    @instrumented
+    @synchronized
+    def review_topic(self, subject, topic, quality):
+        """Record a self-graded review (quality 0-5) of a studied topic"""
+        if not 0 <= quality <= 5:
+            return "Quality must be between 0 and 5"
+        topics = parse_topics(topic)
+        if len(topics) != 1:
+            return "Please enter a single topic"
+        key = self.reviews.review(subject, topics[0], date.today().toordinal(), quality)
+        if key is None:
+            return f"'{topics[0]}' was already reviewed today"
+        self._commit(*self._review_records([key]))
+        return f"Review of '{topics[0]}' recorded, next due {self.reviews.items[key]['due']}"
+    
+    @instrumented
+    @synchronized
+    def get_due_reviews(self, limit=10):
+        """Topics due for review today or earlier, most overdue first"""
+        return self.reviews.due(date.today().toordinal(), limit)
+    
+    @instrumented
+    @synchronized
+    def get_ai_suggestions(self):
+        """Generate AI suggestions based on performance (see suggestions.py)"""
+        return self.suggestion_engine.evaluate()
+    
+    def get_encouragement(self):
+        """Get personalized encouragement"""
+        encouragements = [
+            f"🌟 Great job today, {self.student_name}! Keep pushing forward!",
+            f"🎯 You're doing amazing, {self.student_name}! Stay focused!",
+            f"💪 Proud of your effort, {self.student_name}! You got this!",
+            f"🏆 Excellence is your path, {self.student_name}! Well done!",
+            f"✨ You're crushing it, {self.student_name}! Never give up!",
+            f"🚀 {self.student_name}, you're a star! Keep shining!",
+        ]
+        return random.choice(encouragements)
+    
+    @instrumented
+    @synchronized
+    def get_study_analytics(self):
+        """Get analytics for visualization"""
+        agg = self.aggregates
+        analytics = {
+            'total_study_hours': self.total_study_hours,
+            'current_streak': self.get_current_streak(),
+            'total_assignments': len(self.assignments),
+            'completed_assignments': agg['assignment_status']['Completed'],
+            'pending_assignments': agg['assignment_status']['Pending'],
+            'total_projects': len(self.projects),
+            'total_works': len(self.works),
+            'completed_works': agg['works_completed'],
+        }
+        
+        # Subject-wise breakdown
+        analytics['subject_wise_hours'] = self.get_subject_hours()
+        
+        # Daily study hours (last 7 days)
+        analytics['daily_study'] = self.get_daily_hours(RECENT_DAYS)
+        
+        # Performance scores
+        if agg['score_count']:
+            analytics['avg_score'] = agg['score_sum'] / agg['score_count']
+        else:
+            analytics['avg_score'] = 0
+        
+        return analytics
+    
+    @instrumented
+    @synchronized
+    def get_dashboard_summary(self):
+        """Get complete dashboard summary"""
+        return {
+            'student_name': self.student_name,
+            'analytics': self.get_study_analytics(),
+            'suggestions': self.get_ai_suggestions(),
+            'encouragement': self.get_encouragement(),
+            'assignments': [  # Last 5
+                assignment.to_dict(self.subjects)
+                for assignment in list(islice(reversed(self.assignments.values()), 5))[::-1]
+            ],
+            'projects': self.get_records('projects'),
+            'urgent': self.get_urgent_work(5),
+            'overdue': self.deadlines.count_overdue(date.today().toordinal()),
+            'timetable': self.get_timetable()
+        }
+
+
+class StudentStore:
+    """Per-student data shards with an LRU cache of loaded assistants"""
+    
+    def __init__(self, data_dir="student_data", storage_mode="json",
+                 max_cached=STORE_CACHE_SIZE, legacy_file="student_data.json", defer_writes=False,
+                 archive_days=None):
+        self.data_dir = data_dir
+        self.storage_mode = storage_mode
+        # When set, students archive sessions older than this many days on load
+        self.archive_days = archive_days
+        # Assistants buffer writes until flush_all() persists them
+        self.defer_writes = defer_writes
+        # Evicted assistants whose buffered writes flush_all() still has to persist
+        self.retired = []
+        self.max_cached = max_cached
+        # Single-file data from before sharding is adopted by the default student
+        self.legacy_file = legacy_file
+        self.cache = OrderedDict()
+        # Student name -> Event set once a load in progress has finished
+        self.loading = {}
+        self.lock = threading.Lock()
+    
+    def shard_file(self, student_name):
+        """Data file for a student, fanned out over hash-prefix directories"""
+        key = hashlib.sha1(student_name.encode('utf-8')).hexdigest()
+        slug = re.sub(r'[^a-z0-9]+', '_', student_name.lower()).strip('_')[:40] or 'student'
+        return os.path.join(self.data_dir, key[:2], f"{slug}-{key[:10]}.json")
+    
+    def get(self, student_name):
+        """Return the shared assistant for a student, loading it on a cache miss"""
+        while True:
+            with self.lock:
+                assistant = self.cache.get(student_name)
+                if assistant is not None:
+                    self.cache.move_to_end(student_name)
+                    return assistant
+                
+                for i, retired in enumerate(self.retired):
+                    if retired.student_name == student_name:
+                        # Evicted before its writes were flushed: reuse it rather than read stale data
+                        return self._cache(student_name, self.retired.pop(i))
+                # Loads run outside the lock; others asking for the same student wait for this one
+                loading = self.loading.get(student_name)
+                if loading is None:
+                    loading = self.loading[student_name] = threading.Event()
+                    break
+            loading.wait()
+        
+        assistant = None
+        try:
+            assistant = self._load(student_name)
+        finally:
+            with self.lock:
+                del self.loading[student_name]
+                if assistant is not None:
+                    self._cache(student_name, assistant)
+            loading.set()
+        return assistant
+    
+    def _cache(self, student_name, assistant):
+        """Add an assistant to the cache and evict the least recently used; caller holds the lock"""
+        self.cache[student_name] = assistant
+        while len(self.cache) > self.max_cached:
+            _, evicted = self.cache.popitem(last=False)
+            if self.defer_writes:
+                self.retired.append(evicted)
+        return assistant
+    
+    def _load(self, student_name):
+        data_file = self.shard_file(student_name)
+        os.makedirs(os.path.dirname(data_file), exist_ok=True)
+        if (student_name == "Student" and self.legacy_file
+                and os.path.exists(self.legacy_file) and not os.path.exists(data_file)):
+            shutil.copyfile(self.legacy_file, data_file)
+        return SmartLearningAssistant(student_name, self.storage_mode, data_file,
+                                      defer_writes=self.defer_writes, archive_days=self.archive_days)
+    
+    def flush_all(self):
+        """Persist the buffered writes of every cached or evicted student; returns the records written"""
+        with self.lock:
+            retired = list(self.retired)
+            assistants = list(self.cache.values())
+        written = 0
+        for assistant in retired:
+            written += assistant.flush()
+            with self.lock:
+                # Dropped once written, unless a late write is still buffered or get() revived it
+                if not assistant.storage.pending and assistant in self.retired:
+                    self.retired.remove(assistant)
+        return written + sum(assistant.flush() for assistant in assistants)
@@ -0,0 +1,265 @@
+"""Benchmark SmartLearningAssistant on synthetic student histories.
+
+    python benchmark.py --sizes 100 1000 10000 --storage json journal sqlite
+    python benchmark.py --sizes 1000000 --repeat 1
+    python benchmark.py --save-baseline benchmark_baseline.json
+    python benchmark.py --baseline benchmark_baseline.json
+
+Each operation is reported with wall time, peak Python memory and bytes
+written to disk; load_data also reports the memory the loaded student keeps
+resident. With --baseline the run fails (exit code 1) when an
+operation got slower than the baseline by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from backend import SmartLearningAssistant
+from storage import create_storage, read_json
+
+SUBJECTS = {
+    'Math': ['algebra', 'calculus', 'geometry', 'probability', 'statistics', 'trigonometry'],
+    'Physics': ['kinematics', 'optics', 'thermodynamics', 'electricity', 'waves'],
+    'Chemistry': ['stoichiometry', 'organic chemistry', 'acids and bases', 'bonding'],
+    'Biology': ['cells', 'genetics', 'evolution', 'ecology', 'human body'],
+    'History': ['world war ii', 'renaissance', 'cold war', 'industrial revolution'],
+    'English': ['essay writing', 'poetry', 'grammar', 'shakespeare', 'vocabulary'],
+    'Computer Science': ['recursion', 'sorting', 'graphs', 'databases', 'python'],
+}
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def generate_student_data(sessions, assignments=None, works=None, seed=0, history_days=730):
+    """Build a realistic data dict with the given number of sessions and assignments"""
+    rng = random.Random(seed)
+    assignments = sessions if assignments is None else assignments
+    works = assignments // 2 if works is None else works
+    now = datetime.now().replace(microsecond=0)
+    start = now - timedelta(days=history_days)
+    subjects = list(SUBJECTS)
+
+    def moment():
+        return start + timedelta(seconds=rng.randrange(history_days * 86400))
+
+    study_log = []
+    total_hours = 0.0
+    for when in sorted(moment() for _ in range(sessions)):
+        subject = rng.choice(subjects)
+        hours = rng.choice([0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0])
+        total_hours += hours
+        study_log.append({
+            'date': when.strftime("%Y-%m-%d"),
+            'timestamp': when.strftime("%Y-%m-%d %H:%M:%S"),
+            'subject': subject,
+            'duration_hours': hours,
+            'topics': ', '.join(rng.sample(SUBJECTS[subject], rng.randint(1, 3)))
+        })
+
+    assignment_list = []
+    for i in range(assignments):
+        created = moment()
+        deadline = created + timedelta(days=rng.randint(1, 21))
+        assignment = {
+            'id': i + 1,
+            'title': f"Assignment {i + 1}",
+            'subject': rng.choice(subjects),
+            'deadline': deadline.strftime("%Y-%m-%d"),
+            'difficulty': rng.choice(["Easy", "Medium", "Hard"]),
+            'status': 'Pending',
+            'created_date': created.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        if deadline < now and rng.random() < 0.9:
+            assignment['status'] = 'Completed'
+            assignment['score'] = rng.randint(40, 100)
+            assignment['completion_date'] = deadline.strftime("%Y-%m-%d")
+        assignment_list.append(assignment)
+
+    work_list = []
+    for i in range(works):
+        when = moment()
+        work_list.append({
+            'id': i + 1,
+            'title': f"Work {i + 1}",
+            'subject': rng.choice(subjects),
+            'duration_hours': rng.choice([0.5, 1.0, 1.5, 2.0]),
+            'completed': rng.random() < 0.7,
+            'date': when.strftime("%Y-%m-%d"),
+            'timestamp': when.strftime("%Y-%m-%d %H:%M:%S")
+        })
+
+    projects = []
+    for i in range(max(1, assignments // 100)):
+        projects.append({
+            'id': i + 1,
+            'title': f"Project {i + 1}",
+            'description': "Synthetic benchmark project",
+            'deadline': (now + timedelta(days=rng.randint(-60, 90))).strftime("%Y-%m-%d"),
+            'status': rng.choice(["In Progress", "Planning", "Review"]),
+            'progress': rng.randint(0, 100),
+            'created_date': moment().strftime("%Y-%m-%d")
+        })
+
+    timetable = {}
+    for day in DAYS:
+        for hour in rng.sample(range(8, 21), 3):
+            timetable.setdefault(day, []).append({
+                'time': f"{hour:02d}:00", 'subject': rng.choice(subjects), 'duration': 1.0
+            })
+
+    return {
+        'assignments': assignment_list,
+        'works': work_list,
+        'projects': projects,
+        'study_log': study_log,
+        'timetable': timetable,
+        'streak': 0,
+        'total_study_hours': total_hours
+    }
+
+
+def write_student_data(path, sessions, **kwargs):
+    """Generate a student history and write it as student_data.json"""
+    with open(path, 'w') as f:
+        json.dump(generate_student_data(sessions, **kwargs), f, indent=2)
+    return path
+
+
+def bytes_written():
+    """Bytes this process has written so far (Linux only, otherwise None)"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('wchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def measure(fn, repeat=3):
+    """Best wall time and bytes written of fn(), plus peak memory of one traced call"""
+    best = None
+    for _ in range(repeat):
+        written = bytes_written()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        if written is not None:
+            written = bytes_written() - written
+        if best is None or elapsed < best['seconds']:
+            best = {'seconds': elapsed, 'bytes_written': written}
+    # tracemalloc slows everything down, so memory gets its own run
+    tracemalloc.start()
+    fn()
+    best['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best
+
+
+def run_size(size, storage_mode="json", repeat=3, seed=0):
+    """Benchmark every operation on a generated history of `size` sessions"""
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = write_student_data(os.path.join(tmp, "student_data.json"), size, seed=seed)
+        if storage_mode != "json":
+            # Write the generated history through the target backend once
+            create_storage(storage_mode, json_file).save(read_json(json_file))
+        tracemalloc.start()
+        assistant = SmartLearningAssistant(storage_mode=storage_mode, data_file=json_file)
+        resident = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        pending = iter([a['id'] for a in assistant.get_records('assignments') if a['status'] == 'Pending'])
+
+        operations = {
+            'load_data': assistant.load_data,
+            'save_data': assistant.save_data,
+            'get_study_analytics': assistant.get_study_analytics,
+            'get_ai_suggestions': assistant.get_ai_suggestions,
+            'get_dashboard_summary': assistant.get_dashboard_summary,
+            'complete_assignment': lambda: assistant.complete_assignment(next(pending, 0), 80),
+            'log_study_session': lambda: assistant.log_study_session("Math", 1.0, "algebra"),
+        }
+        results = {name: measure(fn, repeat) for name, fn in operations.items()}
+        results['load_data']['resident_bytes'] = resident
+        return results
+
+
+def compare(results, baseline, tolerance, min_seconds=0.001):
+    """Return (storage, size, operation, ratio) for operations slower than the baseline allows"""
+    regressions = []
+    for storage_mode, sizes in results.items():
+        for size, operations in sizes.items():
+            for name, current in operations.items():
+                previous = baseline.get(storage_mode, {}).get(size, {}).get(name)
+                # Sub-millisecond timings are mostly noise
+                if not previous or current['seconds'] < min_seconds:
+                    continue
+                ratio = current['seconds'] / previous['seconds']
+                if ratio > 1 + tolerance:
+                    regressions.append((storage_mode, size, name, ratio))
+    return regressions
+
+
+def print_results(results):
+    print(f"{'storage':<8} {'size':>9}  {'operation':<22} {'time (ms)':>11} "
+          f"{'peak (KiB)':>11} {'written (KiB)':>14} {'resident (KiB)':>15}")
+    for storage_mode, sizes in results.items():
+        for size, operations in sizes.items():
+            for name, m in operations.items():
+                written = '-' if m['bytes_written'] is None else f"{m['bytes_written'] / 1024:.1f}"
+                resident = f"{m['resident_bytes'] / 1024:.1f}" if 'resident_bytes' in m else '-'
+                print(f"{storage_mode:<8} {size:>9}  {name:<22} {m['seconds'] * 1000:>11.2f} "
+                      f"{m['peak_bytes'] / 1024:>11.1f} {written:>14} {resident:>15}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--storage', nargs='+', default=["json"], choices=["json", "journal", "sqlite"])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write results as JSON")
+    parser.add_argument('--baseline', help="compare against a saved baseline")
+    parser.add_argument('--save-baseline', help="save results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown before flagging a regression (0.25 = 25%%)")
+    parser.add_argument('--min-ms', type=float, default=1.0,
+                        help="ignore operations faster than this when comparing")
+    parser.add_argument('--generate', metavar='PATH',
+                        help="only write a generated student_data.json of the first size")
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        write_student_data(args.generate, args.sizes[0], seed=args.seed)
+        print(f"Wrote {args.sizes[0]} sessions to {args.generate}")
+        return 0
+
+    results = {}
+    for storage_mode in args.storage:
+        results[storage_mode] = {
+            str(size): run_size(size, storage_mode, args.repeat, args.seed) for size in args.sizes
+        }
+    print_results(results)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_ms / 1000)
+        for storage_mode, size, name, ratio in regressions:
+            print(f"REGRESSION {name} ({storage_mode}, {size}): {ratio:.2f}x baseline")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
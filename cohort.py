@@ -0,0 +1,268 @@
+"""Analytics across a whole cohort of student data files.
+
+    python cohort.py student_data --workers 8 --output report.json
+    python cohort.py student_data --storage sqlite --top 20
+
+Every student file under a directory is read (read-only) in a pool of
+worker processes. A worker turns a chunk of files into one partial:
+cohort sums and histograms, the get_study_analytics() numbers of its own
+students folded into counters, and the top-k students for each
+leaderboard. Partials are merged as they arrive, so memory depends on
+the chunk size and k rather than on the number of students.
+"""
+import argparse
+import heapq
+import json
+import os
+import sqlite3
+import sys
+from collections import Counter
+from datetime import date
+from itertools import islice
+from multiprocessing import Pool
+
+from backend import RECENT_DAYS
+from storage import load_read_only
+
+# Files each worker task reads before handing back a partial
+CHUNK_SIZE = 256
+
+# Students kept per leaderboard
+LEADERBOARD_SIZE = 10
+
+# Failures reported by name; the rest are only counted
+MAX_ERRORS = 20
+
+# Score histogram buckets: 0-9, 10-19, ..., 90-100
+SCORE_BUCKETS = 10
+
+
+def student_files(data_dir, storage_mode="json"):
+    """Data files under a StudentStore directory, in a stable order"""
+    # A journal student may not have a snapshot yet, only its journal
+    suffixes = {"sqlite": ('.db',), "journal": ('.json', '.journal')}.get(storage_mode, ('.json',))
+    for root, dirs, files in os.walk(data_dir):
+        dirs.sort()
+        # load_read_only expects the .json name for every mode
+        names = {os.path.splitext(name)[0] + '.json' for name in files if name.endswith(suffixes)}
+        for name in sorted(names):
+            yield os.path.join(root, name)
+
+
+def student_name(path):
+    """Shard file name without the hash suffix StudentStore adds"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem.rsplit('-', 1)[0] if '-' in stem else stem
+
+
+def student_metrics(data, today):
+    """get_study_analytics() numbers (plus overdue work) of one student's raw data"""
+    status = Counter(assignment.get('status', 'Pending') for assignment in data['assignments'])
+    scores = [assignment['score'] for assignment in data['assignments'] if assignment.get('score')]
+    # Archived sessions only remain as rollups, which the live sessions continue
+    archive = data.get('archive') or {}
+    subject_hours = Counter({subject: hours for subject, hours, _ in archive.get('subjects', ())})
+    day_hours = Counter({date.fromisoformat(day).toordinal(): hours for day, hours in archive.get('daily', ())})
+    for session in data['study_log']:
+        subject_hours[session['subject']] += session['duration_hours']
+        day_hours[date.fromisoformat(session['date']).toordinal()] += session['duration_hours']
+    # Streak: consecutive study days ending today, or yesterday if not yet today
+    day = today if day_hours.get(today) is not None else today - 1
+    streak = 0
+    while day in day_hours:
+        streak += 1
+        day -= 1
+    today_text = date.fromordinal(today).isoformat()
+    overdue = sum(1 for assignment in data['assignments']
+                  if assignment.get('status') != 'Completed' and assignment['deadline'] < today_text)
+    overdue += sum(1 for project in data['projects']
+                   if project.get('status') != 'Completed' and project.get('progress', 0) < 100
+                   and project['deadline'] < today_text)
+    return {
+        'total_study_hours': data['total_study_hours'],
+        'current_streak': streak,
+        'total_assignments': len(data['assignments']),
+        'completed_assignments': status['Completed'],
+        'pending_assignments': status['Pending'],
+        'total_projects': len(data['projects']),
+        'total_works': len(data['works']),
+        'completed_works': sum(1 for work in data['works'] if work.get('completed')),
+        'subject_wise_hours': dict(subject_hours),
+        'daily_study': {date.fromordinal(day).isoformat(): day_hours.get(day, 0.0)
+                        for day in range(today - RECENT_DAYS + 1, today + 1)},
+        'avg_score': sum(scores) / len(scores) if scores else 0,
+        'scores': scores,
+        'overdue': overdue,
+    }
+
+
+def empty_partial():
+    return {
+        'students': 0,
+        'errors': 0,
+        'error_files': [],
+        'totals': Counter(),  # summed per-student counts
+        'subject_hours': Counter(),
+        'daily_study': Counter(),
+        'score_histogram': [0] * SCORE_BUCKETS,
+        'score_sum': 0.0,
+        'score_count': 0,
+        'students_with_overdue': 0,
+        'leaderboards': {'streak': [], 'study_hours': [], 'avg_score': []},
+    }
+
+
+def add_student(partial, name, metrics, top=LEADERBOARD_SIZE):
+    """Fold one student's metrics into a partial"""
+    partial['students'] += 1
+    partial['totals'].update({
+        key: metrics[key] for key in ('total_study_hours', 'total_assignments', 'completed_assignments',
+                                      'pending_assignments', 'total_projects', 'total_works',
+                                      'completed_works', 'overdue')
+    })
+    partial['subject_hours'].update(metrics['subject_wise_hours'])
+    partial['daily_study'].update(metrics['daily_study'])
+    for score in metrics['scores']:
+        partial['score_histogram'][min(max(int(score), 0) // 10, SCORE_BUCKETS - 1)] += 1
+    partial['score_sum'] += sum(metrics['scores'])
+    partial['score_count'] += len(metrics['scores'])
+    partial['students_with_overdue'] += metrics['overdue'] > 0
+    for board, value in (('streak', metrics['current_streak']),
+                         ('study_hours', metrics['total_study_hours']),
+                         ('avg_score', metrics['avg_score'])):
+        entries = partial['leaderboards'][board]
+        if len(entries) < top:
+            heapq.heappush(entries, (value, name))
+        elif (value, name) > entries[0]:
+            heapq.heapreplace(entries, (value, name))
+
+
+def merge_partials(partial, other, top=LEADERBOARD_SIZE):
+    """Fold another partial into the first one"""
+    partial['students'] += other['students']
+    partial['errors'] += other['errors']
+    partial['error_files'] = (partial['error_files'] + other['error_files'])[:MAX_ERRORS]
+    for key in ('totals', 'subject_hours', 'daily_study'):
+        partial[key].update(other[key])
+    partial['score_histogram'] = [a + b for a, b in zip(partial['score_histogram'], other['score_histogram'])]
+    partial['score_sum'] += other['score_sum']
+    partial['score_count'] += other['score_count']
+    partial['students_with_overdue'] += other['students_with_overdue']
+    for board, entries in other['leaderboards'].items():
+        merged = heapq.nlargest(top, partial['leaderboards'][board] + entries)
+        heapq.heapify(merged)
+        partial['leaderboards'][board] = merged
+    return partial
+
+
+def analyze_chunk(task):
+    """Worker: read a chunk of student files into one partial"""
+    paths, storage_mode, today, top = task
+    partial = empty_partial()
+    for path in paths:
+        try:
+            data = load_read_only(storage_mode, path)
+            metrics = student_metrics(data, today)
+        except (OSError, ValueError, KeyError, TypeError, sqlite3.Error) as e:
+            partial['errors'] += 1
+            if len(partial['error_files']) < MAX_ERRORS:
+                partial['error_files'].append(f"{path}: {e}")
+            continue
+        add_student(partial, student_name(path), metrics, top)
+    return partial
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def cohort_report(data_dir, storage_mode="json", workers=None, top=LEADERBOARD_SIZE,
+                  chunk_size=CHUNK_SIZE, today=None):
+    """Merged analytics of every student under data_dir.
+
+    workers=1 reads the files in this process; otherwise a pool of
+    `workers` processes (default: one per core) reads chunks in parallel.
+    """
+    today = (today or date.today()).toordinal()
+    tasks = ((chunk, storage_mode, today, top)
+             for chunk in _chunks(student_files(data_dir, storage_mode), chunk_size))
+    partial = empty_partial()
+    if workers == 1:
+        for task in tasks:
+            merge_partials(partial, analyze_chunk(task), top)
+    else:
+        with Pool(workers) as pool:
+            for result in pool.imap_unordered(analyze_chunk, tasks):
+                merge_partials(partial, result, top)
+    return finish_report(partial, today)
+
+
+def finish_report(partial, today):
+    """Turn a merged partial into the report dict"""
+    students = partial['students']
+    totals = partial['totals']
+    return {
+        'date': date.fromordinal(today).isoformat(),
+        'students': students,
+        'errors': partial['errors'],
+        'error_files': partial['error_files'],
+        'total_study_hours': totals['total_study_hours'],
+        'avg_study_hours': totals['total_study_hours'] / students if students else 0,
+        'assignments': {key: totals[f'{key}_assignments'] for key in ('total', 'completed', 'pending')},
+        'total_projects': totals['total_projects'],
+        'works': {'total': totals['total_works'], 'completed': totals['completed_works']},
+        'overdue': totals['overdue'],
+        'students_with_overdue': partial['students_with_overdue'],
+        'subject_wise_hours': dict(partial['subject_hours'].most_common()),
+        'daily_study': dict(sorted(partial['daily_study'].items())),
+        'avg_score': partial['score_sum'] / partial['score_count'] if partial['score_count'] else 0,
+        'score_histogram': {
+            f"{bucket * 10}-{bucket * 10 + (10 if bucket == SCORE_BUCKETS - 1 else 9)}": count
+            for bucket, count in enumerate(partial['score_histogram'])
+        },
+        'leaderboards': {
+            board: [{'student': name, 'value': value} for value, name in sorted(entries, reverse=True)]
+            for board, entries in partial['leaderboards'].items()
+        },
+    }
+
+
+def print_report(report):
+    print(f"Cohort report for {report['date']}: {report['students']} students, {report['errors']} unreadable")
+    print(f"  study hours  {report['total_study_hours']:.1f} total, {report['avg_study_hours']:.1f} per student")
+    assignments = report['assignments']
+    print(f"  assignments  {assignments['total']} total, {assignments['completed']} completed, "
+          f"{assignments['pending']} pending, {report['overdue']} overdue items "
+          f"({report['students_with_overdue']} students)")
+    print(f"  avg score    {report['avg_score']:.1f}%")
+    for board, entries in report['leaderboards'].items():
+        print(f"  top {board}: " + ", ".join(f"{entry['student']} ({entry['value']:.4g})" for entry in entries))
+    for line in report['error_files']:
+        print(f"  error: {line}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data_dir', nargs='?', default="student_data")
+    parser.add_argument('--storage', default="json", choices=["json", "journal", "sqlite"])
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    parser.add_argument('--top', type=int, default=LEADERBOARD_SIZE, help="students per leaderboard")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--output', help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = cohort_report(args.data_dir, args.storage, args.workers, args.top, args.chunk_size)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Columnar study calendar on NumPy arrays.
+
+When NumPy is installed the assistant keeps study hours and session counts
+in dense (subject id x day) arrays: one column per day, one row per
+subject. A whole history is grouped into it with a single bincount at
+load, later sessions are added in place, and windowed totals are sums over
+a slice of columns. Without NumPy HAVE_NUMPY is False and the assistant
+keeps its per-day dict buckets instead.
+
+Only days within DENSE_DAYS of today get columns. Sessions dated further
+out (a mistyped year, say) are kept in a small dict of outliers that the
+queries add in, so one stray date cannot stretch the arrays over centuries.
+"""
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# Days added whenever the calendar has to grow, so daily logging rarely reallocates
+DAY_CHUNK = 366
+
+# Days either side of today that are kept in columns; others are outliers
+DENSE_DAYS = 30 * 366
+
+
+class StudyCalendar:
+    """Hours and sessions per (subject id, day ordinal) in dense 2-D arrays"""
+
+    def __init__(self):
+        # Column 0 is this day ordinal
+        self.origin = 0
+        self.hours = np.zeros((0, 0))
+        self.sessions = np.zeros((0, 0), dtype=np.int32)
+        today = date.today().toordinal()
+        self.low, self.high = today - DENSE_DAYS, today + DENSE_DAYS
+        # (subject id, day ordinal) -> [hours, sessions] outside low..high
+        self.outliers = {}
+
+    def _reserve(self, first, last, subjects):
+        """Grow the arrays to cover days first..last (within low..high) and subject ids below `subjects`"""
+        rows, cols = self.hours.shape
+        if cols and self.origin <= first and last < self.origin + cols and subjects <= rows:
+            return
+        if cols:
+            start = max(first - DAY_CHUNK, self.low) if first < self.origin else self.origin
+            end = min(last + DAY_CHUNK, self.high + 1) if last >= self.origin + cols else self.origin + cols
+        else:
+            start, end = first, min(last + DAY_CHUNK, self.high + 1)
+        # Rows double when subjects outgrow them; growing only the days keeps them
+        shape = (max(subjects, 2 * rows) if subjects > rows else rows, end - start)
+        offset = self.origin - start
+        for name in ('hours', 'sessions'):
+            grid = getattr(self, name)
+            grown = np.zeros(shape, dtype=grid.dtype)
+            grown[:rows, offset:offset + cols] = grid
+            setattr(self, name, grown)
+        self.origin = start
+
+    def _add_outlier(self, day, subject, hours, sessions):
+        cell = self.outliers.setdefault((subject, day), [0.0, 0])
+        cell[0] += hours
+        cell[1] += sessions
+
+    def _outliers(self, start, end):
+        """(subject id, hours, sessions) of outlier cells between two day ordinals (all when None)"""
+        return [(subject, hours, sessions) for (subject, day), (hours, sessions) in self.outliers.items()
+                if start is None or start <= day <= end]
+
+    def add(self, day, subject, hours, sessions=1):
+        if not self.low <= day <= self.high:
+            self._add_outlier(day, subject, hours, sessions)
+            return
+        self._reserve(day, day, subject + 1)
+        self.hours[subject, day - self.origin] += hours
+        self.sessions[subject, day - self.origin] += sessions
+
+    def add_many(self, days, subjects, hours, sessions=None):
+        """Group many sessions into the calendar with one bincount; `sessions`
+        gives a count per entry when entries are already grouped (default 1)"""
+        if not len(days):
+            return
+        days = np.asarray(days, dtype=np.int64)
+        subjects = np.asarray(subjects, dtype=np.int64)
+        outside = (days < self.low) | (days > self.high)
+        if outside.any():
+            hours = np.asarray(hours, dtype=float)
+            counts = np.ones(len(days), dtype=np.int64) if sessions is None else np.asarray(sessions)
+            for day, subject, cell_hours, cell_sessions in zip(
+                    days[outside].tolist(), subjects[outside].tolist(),
+                    hours[outside].tolist(), counts[outside].tolist()):
+                self._add_outlier(day, subject, cell_hours, int(cell_sessions))
+            inside = ~outside
+            days, subjects, hours = days[inside], subjects[inside], hours[inside]
+            if sessions is not None:
+                sessions = counts[inside]
+            if not len(days):
+                return
+        self._reserve(int(days.min()), int(days.max()), int(subjects.max()) + 1)
+        rows, cols = self.hours.shape
+        cells = subjects * cols + (days - self.origin)
+        self.hours += np.bincount(cells, weights=hours, minlength=rows * cols).reshape(rows, cols)
+        counts = np.bincount(cells, weights=sessions, minlength=rows * cols).reshape(rows, cols)
+        self.sessions += counts.astype(np.int32)
+
+    def _columns(self, start, end):
+        """Slice of stored columns for day ordinals start..end (all days when None)"""
+        cols = self.hours.shape[1]
+        if start is None:
+            return slice(0, cols)
+        lo = min(max(start - self.origin, 0), cols)
+        return slice(lo, max(lo, min(end - self.origin + 1, cols)))
+
+    def daily_totals(self, start, end):
+        """Hours for each day ordinal from start to end (inclusive)"""
+        totals = np.zeros(end - start + 1)
+        columns = self._columns(start, end)
+        if columns.stop > columns.start:
+            at = columns.start + self.origin - start
+            totals[at:at + columns.stop - columns.start] = self.hours[:, columns].sum(axis=0)
+        for (_, day), (hours, _) in self.outliers.items():
+            if start <= day <= end:
+                totals[day - start] += hours
+        return totals
+
+    def subject_hours(self, start=None, end=None):
+        """(subject ids, hours) of the subjects with sessions between two day ordinals"""
+        columns = self._columns(start, end)
+        outliers = self._outliers(start, end)
+        if not outliers:
+            studied = np.flatnonzero(self.sessions[:, columns].sum(axis=1))
+            return studied, self.hours[studied, columns].sum(axis=1)
+        rows = self.hours.shape[0]
+        size = max(rows, max(subject for subject, _, _ in outliers) + 1)
+        hours, sessions = np.zeros(size), np.zeros(size, dtype=np.int64)
+        hours[:rows] = self.hours[:, columns].sum(axis=1)
+        sessions[:rows] = self.sessions[:, columns].sum(axis=1)
+        for subject, cell_hours, cell_sessions in outliers:
+            hours[subject] += cell_hours
+            sessions[subject] += cell_sessions
+        studied = np.flatnonzero(sessions)
+        return studied, hours[studied]
+
+    def total(self, start, end, subject=None):
+        """Hours between two day ordinals, optionally for one subject id"""
+        columns = self._columns(start, end)
+        extra = sum(hours for outlier, hours, _ in self._outliers(start, end) if subject in (None, outlier))
+        if subject is None:
+            return float(self.hours[:, columns].sum()) + extra
+        if subject >= self.hours.shape[0]:
+            return float(extra)
+        return float(self.hours[subject, columns].sum()) + extra
@@ -0,0 +1,63 @@
+"""Unfinished assignments and projects ordered by deadline.
+
+Entries are (deadline ordinal, kind, id) tuples kept in a sorted list, so
+"overdue", "next N due" and "due within K days" are binary searches plus a
+slice of the answer.
+"""
+from bisect import bisect_left, insort
+import heapq
+
+
+class DeadlineIndex:
+    """Sorted (deadline ordinal, kind, id) entries of open work"""
+
+    def __init__(self, entries=()):
+        self.entries = sorted(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, entry):
+        insort(self.entries, entry)
+
+    def remove(self, entry):
+        i = bisect_left(self.entries, entry)
+        if i < len(self.entries) and self.entries[i] == entry:
+            del self.entries[i]
+
+    def count_overdue(self, today):
+        return bisect_left(self.entries, (today,))
+
+    def overdue(self, today, limit=None):
+        """Entries due before today, most overdue first"""
+        end = self.count_overdue(today)
+        return self.entries[:end if limit is None else min(end, limit)]
+
+    def next_due(self, today, n):
+        """The n entries due soonest from today on"""
+        start = bisect_left(self.entries, (today,))
+        return self.entries[start:start + n]
+
+    def due_within(self, today, days):
+        """Entries due from today up to and including today + days"""
+        start = bisect_left(self.entries, (today,))
+        return self.entries[start:bisect_left(self.entries, (today + days + 1,))]
+
+    def most_urgent(self, n, lead, max_lead):
+        """The n entries with the earliest deadline - lead(entry), ties by deadline.
+
+        lead(entry) is between 0 and max_lead days, so the scan stops as soon
+        as no later deadline can beat the n-th best.
+        """
+        if n <= 0:
+            return []
+        best = []  # (-score, -position, entry), worst of the n best on top
+        for position, entry in enumerate(self.entries):
+            if len(best) == n and entry[0] - max_lead >= -best[0][0]:
+                break
+            item = (lead(entry) - entry[0], -position, entry)
+            if len(best) < n:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+        return [entry for _, _, entry in sorted(best, reverse=True)]
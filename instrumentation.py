@@ -0,0 +1,147 @@
+"""Opt-in call counters and histograms for the assistant and the app.
+
+Turned on with the SLA_METRICS=1 environment variable or by setting
+METRICS.enabled at runtime. While disabled, instrumented calls cost one
+attribute check.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# Histogram bucket upper bounds per metric family
+BUCKETS = {
+    'duration_seconds': (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                         0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    'write_bytes': (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+    'coalesced_records': (1, 2, 5, 10, 25, 50, 100, 250, 1000),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def to_dict(self):
+        cumulative, running = {}, 0
+        for bound, n in zip(list(self.bounds) + ['+Inf'], self.buckets):
+            running += n
+            cumulative[str(bound)] = running
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'max': self.max,
+            'buckets': cumulative,
+        }
+
+
+class Metrics:
+    """Registry of histograms and error counters keyed by (family, name)"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.errors = {}
+
+    def observe(self, family, name, value):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get((family, name))
+            if histogram is None:
+                histogram = self.histograms[(family, name)] = Histogram(BUCKETS[family])
+            histogram.observe(value)
+
+    def error(self, name):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def snapshot(self):
+        """All metrics as plain dicts: {family: {name: histogram}} plus errors"""
+        with self.lock:
+            families = {}
+            for (family, name), histogram in sorted(self.histograms.items()):
+                families.setdefault(family, {})[name] = histogram.to_dict()
+            return {'enabled': self.enabled, 'metrics': families, 'errors': dict(self.errors)}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix="sla"):
+        """Metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        for family, histograms in snapshot['metrics'].items():
+            metric = f"{prefix}_{family}"
+            lines.append(f"# TYPE {metric} histogram")
+            for name, h in histograms.items():
+                for bound, n in h['buckets'].items():
+                    lines.append(f'{metric}_bucket{{name="{name}",le="{bound}"}} {n}')
+                lines.append(f'{metric}_sum{{name="{name}"}} {h["sum"]}')
+                lines.append(f'{metric}_count{{name="{name}"}} {h["count"]}')
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        for name, n in sorted(snapshot['errors'].items()):
+            lines.append(f'{prefix}_errors_total{{name="{name}"}} {n}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics(enabled=os.environ.get("SLA_METRICS") == "1")
+
+
+@contextmanager
+def timed(name):
+    """Record the duration of a block under duration_seconds/name"""
+    if not METRICS.enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        METRICS.error(name)
+        raise
+    finally:
+        METRICS.observe('duration_seconds', name, time.perf_counter() - started)
+
+
+def instrumented(method):
+    """Count calls and record the latency of a function when metrics are on"""
+    name = method.__qualname__
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        if not METRICS.enabled:
+            return method(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except BaseException:
+            METRICS.error(name)
+            raise
+        finally:
+            METRICS.observe('duration_seconds', name, time.perf_counter() - started)
+    return wrapper
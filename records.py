@@ -0,0 +1,220 @@
+"""Compact in-memory records for study sessions, assignments and works.
+
+Records are slotted objects: subjects are interned to small integer ids,
+days are stored as date ordinals and timestamps as seconds since
+0001-01-01. They are turned back into the dicts of student_data.json only
+at the storage and DataFrame boundaries (to_dict / from_dict).
+"""
+import sys
+from datetime import date
+from functools import lru_cache
+
+DAY_SECONDS = 86400
+
+
+@lru_cache(maxsize=4096)
+def day_ordinal(text):
+    """"%Y-%m-%d" -> day ordinal (cached: histories repeat the same days, and
+    records then share one int object per day)"""
+    return date.fromisoformat(text).toordinal()
+
+
+@lru_cache(maxsize=4096)
+def day_text(ordinal):
+    return date.fromordinal(ordinal).isoformat()
+
+
+def stamp_seconds(text):
+    """"%Y-%m-%d %H:%M:%S" (or a bare date) -> seconds since 0001-01-01"""
+    seconds = day_ordinal(text[:10]) * DAY_SECONDS
+    if len(text) > 10:
+        if len(text) != 19 or text[10] != ' ' or text[13] != ':' or text[16] != ':':
+            raise ValueError(f"Invalid timestamp: {text!r}")
+        seconds += int(text[11:13]) * 3600 + int(text[14:16]) * 60 + int(text[17:19])
+    return seconds
+
+
+def stamp_text(seconds):
+    day, rest = divmod(seconds, DAY_SECONDS)
+    minutes, second = divmod(rest, 60)
+    hour, minute = divmod(minutes, 60)
+    return '%s %02d:%02d:%02d' % (day_text(day), hour, minute, second)
+
+
+def now_seconds(now):
+    """Seconds since 0001-01-01 of a naive datetime"""
+    return now.toordinal() * DAY_SECONDS + now.hour * 3600 + now.minute * 60 + now.second
+
+
+class SubjectTable:
+    """Interns subject names to small integer ids (per assistant, not persisted)"""
+    __slots__ = ('names', 'ids')
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+
+    def intern(self, name):
+        subject_id = self.ids.get(name)
+        if subject_id is None:
+            subject_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return subject_id
+
+    def lookup(self, name):
+        """Id of a known subject, or None without interning it"""
+        return self.ids.get(name)
+
+    def name(self, subject_id):
+        return self.names[subject_id]
+
+
+def _extra(data, keys):
+    """Fields we do not model, carried along so round trips stay lossless"""
+    if keys.issuperset(data):
+        return None
+    return {k: v for k, v in data.items() if k not in keys}
+
+
+class StudySession:
+    __slots__ = ('day', 'time', 'subject', 'hours', 'topics', 'extra')
+    KEYS = frozenset(('date', 'timestamp', 'subject', 'duration_hours', 'topics'))
+    # dict field -> attribute, for filters and sorting
+    FIELDS = {'date': 'day', 'timestamp': 'time', 'subject': 'subject',
+              'duration_hours': 'hours', 'topics': 'topics'}
+
+    def __init__(self, day, time, subject, hours, topics, extra=None):
+        self.day = day
+        self.time = time
+        self.subject = subject
+        self.hours = hours
+        self.topics = topics
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data, subjects):
+        return cls(
+            day_ordinal(data['date']),
+            stamp_seconds(data.get('timestamp') or data['date']),
+            subjects.intern(data['subject']),
+            data['duration_hours'],
+            data.get('topics', ''),
+            _extra(data, cls.KEYS),
+        )
+
+    def to_dict(self, subjects):
+        record = {
+            'date': day_text(self.day),
+            'timestamp': stamp_text(self.time),
+            'subject': subjects.name(self.subject),
+            'duration_hours': self.hours,
+            'topics': self.topics
+        }
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+
+class Assignment:
+    __slots__ = ('id', 'title', 'subject', 'deadline', 'difficulty', 'status',
+                 'created', 'score', 'completed_on', 'extra')
+    KEYS = frozenset(('id', 'title', 'subject', 'deadline', 'difficulty', 'status',
+                      'created_date', 'score', 'completion_date'))
+    FIELDS = {'id': 'id', 'title': 'title', 'subject': 'subject', 'deadline': 'deadline',
+              'difficulty': 'difficulty', 'status': 'status', 'created_date': 'created',
+              'score': 'score', 'completion_date': 'completed_on'}
+
+    def __init__(self, id, title, subject, deadline, difficulty, status, created,
+                 score=None, completed_on=None, extra=None):
+        self.id = id
+        self.title = title
+        self.subject = subject
+        self.deadline = deadline
+        self.difficulty = difficulty
+        self.status = status
+        self.created = created
+        self.score = score
+        self.completed_on = completed_on
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data, subjects):
+        completion_date = data.get('completion_date')
+        return cls(
+            data.get('id'),
+            data['title'],
+            subjects.intern(data['subject']),
+            day_ordinal(data['deadline']),
+            sys.intern(data.get('difficulty', 'Medium')),
+            sys.intern(data.get('status', 'Pending')),
+            stamp_seconds(data['created_date']),
+            data.get('score'),
+            day_ordinal(completion_date) if completion_date else None,
+            _extra(data, cls.KEYS),
+        )
+
+    def to_dict(self, subjects):
+        record = {
+            'id': self.id,
+            'title': self.title,
+            'subject': subjects.name(self.subject),
+            'deadline': day_text(self.deadline),
+            'difficulty': self.difficulty,
+            'status': self.status,
+            'created_date': stamp_text(self.created)
+        }
+        if self.score is not None:
+            record['score'] = self.score
+        if self.completed_on is not None:
+            record['completion_date'] = day_text(self.completed_on)
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+
+class Work:
+    __slots__ = ('id', 'title', 'subject', 'hours', 'completed', 'day', 'time', 'extra')
+    KEYS = frozenset(('id', 'title', 'subject', 'duration_hours', 'completed', 'date', 'timestamp'))
+    FIELDS = {'id': 'id', 'title': 'title', 'subject': 'subject', 'duration_hours': 'hours',
+              'completed': 'completed', 'date': 'day', 'timestamp': 'time'}
+
+    def __init__(self, id, title, subject, hours, completed, day, time, extra=None):
+        self.id = id
+        self.title = title
+        self.subject = subject
+        self.hours = hours
+        self.completed = completed
+        self.day = day
+        self.time = time
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data, subjects):
+        return cls(
+            data.get('id'),
+            data['title'],
+            subjects.intern(data['subject']),
+            data['duration_hours'],
+            bool(data.get('completed', False)),
+            day_ordinal(data['date']),
+            stamp_seconds(data.get('timestamp') or data['date']),
+            _extra(data, cls.KEYS),
+        )
+
+    def to_dict(self, subjects):
+        record = {
+            'id': self.id,
+            'title': self.title,
+            'subject': subjects.name(self.subject),
+            'duration_hours': self.hours,
+            'completed': self.completed,
+            'date': day_text(self.day),
+            'timestamp': stamp_text(self.time)
+        }
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+
+# Record class per collection; projects stay plain dicts
+RECORD_TYPES = {'assignments': Assignment, 'works': Work, 'study_log': StudySession}
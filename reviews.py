@@ -0,0 +1,102 @@
+"""Spaced-repetition schedule of studied topics (SM-2).
+
+Topics from study sessions are normalized into review items keyed by
+"subject|topic". Each item keeps the SM-2 interval, ease factor and
+repetition count; a heap of (due ordinal, key) answers "what is due today"
+in O(k log n) without scanning every item.
+"""
+from functools import lru_cache
+import heapq
+import re
+
+from records import day_ordinal, day_text
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+# Longest gap between two reviews, in days
+MAX_INTERVAL = 365
+
+# Recall quality (0-5) credited to the topics of a logged study session
+SESSION_QUALITY = 4
+
+
+@lru_cache(maxsize=4096)
+def parse_topics(text):
+    """Split a free-text topics field into normalized, de-duplicated topic names"""
+    topics = []
+    for part in re.split(r'[,;\n]+', text or ''):
+        topic = ' '.join(part.split()).lower()
+        if topic and topic not in topics:
+            topics.append(topic)
+    return tuple(topics)
+
+
+def topic_key(subject, topic):
+    return f"{' '.join(subject.split()).lower()}|{topic}"
+
+
+class ReviewScheduler:
+    """Review items by key plus a lazily cleaned heap of due dates"""
+
+    def __init__(self, items=None):
+        self.items = dict(items or {})
+        self._rebuild_heap()
+
+    def __len__(self):
+        return len(self.items)
+
+    def _rebuild_heap(self):
+        self.heap = [(day_ordinal(item['due']), key) for key, item in self.items.items()]
+        heapq.heapify(self.heap)
+
+    def review(self, subject, topic, day, quality=SESSION_QUALITY):
+        """Apply one SM-2 review of a topic on a day ordinal.
+
+        Returns the item key, or None when a passing review repeats one from
+        the same or a later day (it would only stretch the interval).
+        """
+        key = topic_key(subject, topic)
+        item = self.items.get(key)
+        if item is None:
+            item = {'subject': subject, 'topic': topic, 'interval': 0, 'ease': DEFAULT_EASE,
+                    'repetitions': 0, 'due': None, 'last_review': None}
+        elif quality >= 3 and day <= day_ordinal(item['last_review']):
+            return None
+        if quality < 3:
+            item['repetitions'] = 0
+            item['interval'] = 1
+        else:
+            item['repetitions'] += 1
+            if item['repetitions'] == 1:
+                item['interval'] = 1
+            elif item['repetitions'] == 2:
+                item['interval'] = 6
+            else:
+                # A review before the due day only proves recall over the days since the last one
+                elapsed = min(item['interval'], day - day_ordinal(item['last_review']))
+                item['interval'] = min(MAX_INTERVAL, round(elapsed * item['ease']))
+        miss = 5 - quality
+        item['ease'] = max(MIN_EASE, round(item['ease'] + 0.1 - miss * (0.08 + miss * 0.02), 2))
+        item['last_review'] = day_text(day)
+        item['due'] = day_text(day + item['interval'])
+        self.items[key] = item
+        heapq.heappush(self.heap, (day + item['interval'], key))
+        # Rescheduling leaves the old heap entry behind; drop them in bulk
+        if len(self.heap) > 2 * len(self.items) + 64:
+            self._rebuild_heap()
+        return key
+
+    def due(self, today, limit=None):
+        """Items due on or before a day ordinal, most overdue first"""
+        found, keep = {}, []
+        while self.heap and self.heap[0][0] <= today and (limit is None or len(found) < limit):
+            entry = heapq.heappop(self.heap)
+            due, key = entry
+            item = self.items.get(key)
+            # Entries for since-rescheduled items are stale and stay dropped
+            if item is not None and day_ordinal(item['due']) == due and key not in found:
+                found[key] = item
+                keep.append(entry)
+        for entry in keep:
+            heapq.heappush(self.heap, entry)
+        return [dict(item, key=key) for key, item in found.items()]
@@ -0,0 +1,740 @@
+import json
+import os
+import pathlib
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager, nullcontext
+
+from instrumentation import METRICS, instrumented
+from collections import Counter
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Journal size (bytes) after which it is folded back into the snapshot
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+# Column layout of the SQLite tables; missing columns are added on open
+TABLES = {
+    'assignments': [
+        ('id', 'INTEGER PRIMARY KEY'),
+        ('title', 'TEXT'),
+        ('subject', 'TEXT'),
+        ('deadline', 'TEXT'),
+        ('difficulty', 'TEXT'),
+        ('status', 'TEXT'),
+        ('created_date', 'TEXT'),
+        ('score', 'REAL'),
+        ('completion_date', 'TEXT'),
+    ],
+    'works': [
+        ('id', 'INTEGER PRIMARY KEY'),
+        ('title', 'TEXT'),
+        ('subject', 'TEXT'),
+        ('duration_hours', 'REAL'),
+        ('completed', 'INTEGER'),
+        ('date', 'TEXT'),
+        ('timestamp', 'TEXT'),
+    ],
+    'projects': [
+        ('id', 'INTEGER PRIMARY KEY'),
+        ('title', 'TEXT'),
+        ('description', 'TEXT'),
+        ('deadline', 'TEXT'),
+        ('status', 'TEXT'),
+        ('progress', 'INTEGER'),
+        ('created_date', 'TEXT'),
+    ],
+    'study_log': [
+        ('row_id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+        ('date', 'TEXT'),
+        ('timestamp', 'TEXT'),
+        ('subject', 'TEXT'),
+        ('duration_hours', 'REAL'),
+        ('topics', 'TEXT'),
+    ],
+    'timetable': [
+        ('row_id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
+        ('day', 'TEXT'),
+        ('time', 'TEXT'),
+        ('subject', 'TEXT'),
+        ('duration', 'REAL'),
+        ('note', 'TEXT'),
+        ('assignment', 'INTEGER'),
+    ],
+    'reviews': [
+        ('key', 'TEXT PRIMARY KEY'),
+        ('subject', 'TEXT'),
+        ('topic', 'TEXT'),
+        ('interval', 'INTEGER'),
+        ('ease', 'REAL'),
+        ('repetitions', 'INTEGER'),
+        ('due', 'TEXT'),
+        ('last_review', 'TEXT'),
+    ],
+}
+
+INDEXES = {
+    'assignments': ['status', 'subject', 'deadline'],
+    'works': ['completed', 'subject', 'date'],
+    'projects': ['status', 'deadline'],
+    'study_log': ['date', 'subject'],
+    'timetable': ['day'],
+    'reviews': ['due'],
+}
+
+# Boolean columns stored as 0/1 integers
+BOOL_COLUMNS = {('works', 'completed')}
+
+
+def empty_data():
+    """Return the initial state of a new student"""
+    return {
+        'assignments': [],
+        'works': [],
+        'projects': [],
+        'study_log': [],
+        'timetable': {},
+        'reviews': {},
+        'streak': 0,
+        'total_study_hours': 0.0
+    }
+
+
+# Collections whose records are addressed by id in update/delete records
+KEYED_COLLECTIONS = ('assignments', 'works', 'projects')
+
+
+def apply_record(data, record):
+    """Apply one journaled mutation to loaded data whose keyed collections are id -> record dicts"""
+    op = record['op']
+    if op == 'append':
+        if record['key'] in KEYED_COLLECTIONS:
+            data[record['key']][record['value']['id']] = record['value']
+        else:
+            data.setdefault(record['key'], []).append(record['value'])
+    elif op == 'update':
+        item = data[record['key']].get(record['id'])
+        if item is not None:
+            item.update(record['value'])
+    elif op == 'delete':
+        data[record['key']].pop(record['id'], None)
+    elif op == 'set':
+        data[record['key']] = record['value']
+    elif op == 'put':
+        data.setdefault(record['key'], {})[record['id']] = record['value']
+    elif op == 'timetable':
+        data.setdefault('timetable', {}).setdefault(record['day'], []).append(record['value'])
+    elif op == 'timetable_remove':
+        entries = data.get('timetable', {}).get(record['day'], [])
+        for i, entry in enumerate(entries):
+            if entry['time'] == record['time'] and entry.get('assignment') == record.get('assignment'):
+                del entries[i]
+                break
+        if not entries:
+            data.get('timetable', {}).pop(record['day'], None)
+
+
+def rebase_records(data, records):
+    """Apply records made against an older copy of data, which another process
+    has written to since. The records are fixed up in place to fit the newer
+    data: appends whose id the newer sequence has handed out meanwhile (even
+    if deleted again) get the next free one, later updates and deletes of the
+    batch follow them, next_ids becomes the larger of both sequences and the
+    running total of study hours adds this batch's sessions to the newer total."""
+    moved = {}
+    next_ids = data.setdefault('next_ids', {})
+    base, added = data.get('total_study_hours', 0.0), 0.0
+    for record in records:
+        op, key = record['op'], record.get('key')
+        if op == 'append' and key in KEYED_COLLECTIONS:
+            record_id = record['value']['id']
+            free = max(next_ids.get(key, 1), max(data[key], default=0) + 1)
+            if record_id in data[key] or record_id < next_ids.get(key, 1):
+                moved[key, record_id] = record_id = free
+                record['value'] = dict(record['value'], id=record_id)
+            next_ids[key] = max(free, record_id + 1)
+        elif op in ('update', 'delete') and (key, record['id']) in moved:
+            record['id'] = moved[key, record['id']]
+        elif op == 'append' and key == 'study_log':
+            added += record['value']['duration_hours']
+        elif op == 'set' and key == 'total_study_hours':
+            record['value'] = base + added
+        elif op == 'set' and key == 'next_ids':
+            record['value'] = {kind: max(record['value'].get(kind, 1), next_ids.get(kind, 1))
+                               for kind in {**record['value'], **next_ids}}
+        apply_record(data, record)
+
+
+def file_stamp(path):
+    """Identity of a file's current contents, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock on path + '.lock' across processes"""
+    with open(path + '.lock', 'a+') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_json(path, data, **dump_args):
+    """Write JSON to a temp file in the same directory, rename it over path and return its size"""
+    fd, tmp_file = tempfile.mkstemp(
+        dir=os.path.dirname(path) or '.', prefix=os.path.basename(path), suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, **dump_args)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(tmp_file, path)
+        return size
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+
+
+def read_json(path):
+    """Read a data file, falling back to an empty student"""
+    data = empty_data()
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            data.update(json.load(f))
+    return data
+
+
+class FileStorage:
+    """Base of the file backends. locked() holds file_lock() on the data file across
+    several calls, which load, save and commit inside it join instead of locking again"""
+
+    lock_depth = 0
+
+    @contextmanager
+    def locked(self):
+        with nullcontext() if self.lock_depth else file_lock(self.data_file):
+            self.lock_depth += 1
+            try:
+                yield
+            finally:
+                self.lock_depth -= 1
+
+    def stale(self):
+        """Whether another process wrote the files since we last read or wrote them"""
+        return self._stamp() != self.stamp
+
+
+class JSONStorage(FileStorage):
+    """Whole-file JSON storage: every commit rewrites the document.
+
+    Another process sharing the file is noticed by its stamp changing
+    since our last read or write; commit then merges into its version.
+    """
+
+    # Set when a commit merged into data another process wrote; the owner reloads
+    merged = False
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.stamp = None
+
+    def _stamp(self):
+        return file_stamp(self.data_file)
+
+    @instrumented
+    def load(self):
+        with self.locked():
+            data = read_json(self.data_file)
+            self.stamp = self._stamp()
+            return data
+
+    @instrumented
+    def save(self, data):
+        with self.locked():
+            self._write(data)
+
+    def _write(self, data):
+        size = atomic_write_json(self.data_file, data, indent=2)
+        self.stamp = self._stamp()
+        METRICS.observe('write_bytes', 'JSONStorage.save', size)
+
+    @instrumented
+    def commit(self, records, snapshot):
+        """Persist mutations already applied in memory"""
+        with self.locked():
+            if not self.stale():
+                self._write(snapshot())
+                return
+            data = read_json(self.data_file)
+            for key in KEYED_COLLECTIONS:
+                data[key] = {item['id']: item for item in data[key]}
+            rebase_records(data, records)
+            for key in KEYED_COLLECTIONS:
+                data[key] = list(data[key].values())
+            self._write(data)
+            self.merged = True
+
+
+class JournalStorage(FileStorage):
+    """Snapshot plus an append-only journal of compact mutation records.
+
+    Like JSONStorage, a commit after another process wrote first replays
+    the files and continues their sequence instead of ours.
+    """
+
+    merged = False
+
+    def __init__(self, data_file, journal_file=None, compact_bytes=JOURNAL_COMPACT_BYTES):
+        self.data_file = data_file
+        self.journal_file = journal_file or os.path.splitext(data_file)[0] + '.journal'
+        self.compact_bytes = compact_bytes
+        self.seq = 0
+        self.stamp = None
+
+    def _stamp(self):
+        return file_stamp(self.data_file), file_stamp(self.journal_file)
+
+    @instrumented
+    def load(self):
+        with self.locked():
+            data = self._read()
+            for key in KEYED_COLLECTIONS:
+                data[key] = list(data[key].values())
+            return data
+
+    def _read(self, repair=True):
+        """Snapshot plus journal, with keyed collections as id -> record dicts; caller
+        holds the lock, unless repair is False and nothing is written"""
+        data = read_json(self.data_file)
+        self.seq = data.pop('journal_seq', 0)
+        # Replay against id-keyed collections so updates and deletes are lookups
+        for key in KEYED_COLLECTIONS:
+            data[key] = {item['id']: item for item in data[key]}
+        if os.path.exists(self.journal_file):
+            # A record counts once its newline is written; anything after the
+            # last one is the torn tail of an interrupted append
+            good = 0
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    if record['seq'] > self.seq:
+                        apply_record(data, record)
+                        self.seq = record['seq']
+                    good += len(line)
+            # Cut the tail off, or the next append would be glued onto it
+            if repair and good < os.path.getsize(self.journal_file):
+                os.truncate(self.journal_file, good)
+        self.stamp = self._stamp()
+        return data
+
+    @instrumented
+    def save(self, data):
+        with self.locked():
+            self._write_snapshot(data)
+
+    def _write_snapshot(self, data):
+        # Snapshot first, then drop the journal: records already folded in are
+        # skipped by sequence number if we crash in between
+        size = atomic_write_json(self.data_file, dict(data, journal_seq=self.seq), separators=(',', ':'))
+        METRICS.observe('write_bytes', 'JournalStorage.snapshot', size)
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.stamp = self._stamp()
+
+    @instrumented
+    def commit(self, records, snapshot):
+        """Append mutations to the journal, compacting when it grows too large"""
+        with self.locked():
+            data = None
+            if self.stale():
+                data = self._read()
+                rebase_records(data, records)
+                self.merged = True
+            lines = []
+            for record in records:
+                self.seq += 1
+                record['seq'] = self.seq
+                lines.append(json.dumps(record, separators=(',', ':')))
+            text = '\n'.join(lines) + '\n'
+            with open(self.journal_file, 'a') as f:
+                f.write(text)
+            self.stamp = self._stamp()
+            METRICS.observe('write_bytes', 'JournalStorage.commit', len(text))
+            if os.path.getsize(self.journal_file) >= self.compact_bytes:
+                if data is not None:
+                    # Our memory is behind the files; fold in what they hold
+                    for key in KEYED_COLLECTIONS:
+                        data[key] = list(data[key].values())
+                    self._write_snapshot(data)
+                else:
+                    self._write_snapshot(snapshot())
+
+
+class SQLiteStorage:
+    """SQLite storage with one indexed table per collection"""
+
+    merged = False
+
+    def __init__(self, db_file, read_only=False):
+        self.db_file = db_file
+        if read_only:
+            # No schema upgrade either; load() skips tables an older file lacks
+            self.conn = sqlite3.connect(f"{pathlib.Path(db_file).absolute().as_uri()}?mode=ro", uri=True,
+                                        timeout=30, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if not read_only:
+            self.create_schema()
+        # Changes whenever another connection commits, see commit()
+        self.data_version = self._data_version()
+
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    @contextmanager
+    def locked(self):
+        """One write transaction across several calls; load, save and commit inside it join it"""
+        if self.conn.in_transaction:
+            yield
+            return
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            yield
+
+    def stale(self):
+        """Whether another connection committed since we last read or wrote"""
+        return self._data_version() != self.data_version
+
+    def create_schema(self):
+        with self.conn:
+            for table, columns in TABLES.items():
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    f"({', '.join(f'{name} {kind}' for name, kind in columns)})"
+                )
+                existing = {row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+                for name, kind in columns:
+                    if name not in existing:
+                        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+                for column in INDEXES.get(table, []):
+                    self.conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})"
+                    )
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _to_row(self, table, record):
+        row = {}
+        for name, _ in TABLES[table]:
+            if name in record:
+                value = record[name]
+                row[name] = int(value) if (table, name) in BOOL_COLUMNS else value
+        return row
+
+    def _from_row(self, table, row):
+        record = {}
+        for name in row.keys():
+            if name == 'row_id' or row[name] is None:
+                continue
+            value = row[name]
+            record[name] = bool(value) if (table, name) in BOOL_COLUMNS else value
+        return record
+
+    def _insert(self, table, record):
+        row = self._to_row(table, record)
+        self.conn.execute(
+            f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+            list(row.values())
+        )
+
+    def _update(self, table, record_id, fields):
+        row = self._to_row(table, fields)
+        if row:
+            self.conn.execute(
+                f"UPDATE {table} SET {', '.join(f'{name} = ?' for name in row)} WHERE id = ?",
+                list(row.values()) + [record_id]
+            )
+
+    def _put_reviews(self, items):
+        for key, item in items.items():
+            row = self._to_row('reviews', dict(item, key=key))
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO reviews ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                list(row.values())
+            )
+
+    def _set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
+
+    @instrumented
+    def load(self):
+        self.data_version = self._data_version()
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        data = empty_data()
+        for table in ('assignments', 'works', 'projects', 'study_log'):
+            order = 'row_id' if table == 'study_log' else 'id'
+            data[table] = [
+                self._from_row(table, row)
+                for row in self.conn.execute(f"SELECT * FROM {table} ORDER BY {order}")
+            ] if table in tables else []
+        if 'timetable' in tables:
+            for row in self.conn.execute("SELECT * FROM timetable ORDER BY row_id"):
+                entry = self._from_row('timetable', row)
+                data['timetable'].setdefault(entry.pop('day'), []).append(entry)
+        if 'reviews' in tables:
+            for row in self.conn.execute("SELECT * FROM reviews"):
+                item = self._from_row('reviews', row)
+                data['reviews'][item.pop('key')] = item
+        if 'meta' in tables:
+            for row in self.conn.execute("SELECT key, value FROM meta"):
+                data[row['key']] = json.loads(row['value'])
+        return data
+
+    @instrumented
+    def save(self, data):
+        """Replace the whole database contents with a data dict"""
+        with self.locked():
+            for table in TABLES:
+                self.conn.execute(f"DELETE FROM {table}")
+            self.conn.execute("DELETE FROM meta")
+            for table in ('assignments', 'works', 'projects', 'study_log'):
+                for record in data.get(table, []):
+                    self._insert(table, record)
+            for day, entries in data.get('timetable', {}).items():
+                for entry in entries:
+                    self._insert('timetable', dict(entry, day=day))
+            self._put_reviews(data.get('reviews', {}))
+            for key, value in data.items():
+                if key not in TABLES:
+                    self._set_meta(key, value)
+
+    @instrumented
+    def commit(self, records, snapshot):
+        """Apply mutations as row-level statements in one transaction"""
+        with self.locked():
+            if self.stale():
+                self._rebase(records)
+                self.merged = True
+            for record in records:
+                op = record['op']
+                if op == 'append':
+                    self._insert(record['key'], record['value'])
+                elif op == 'update':
+                    self._update(record['key'], record['id'], record['value'])
+                elif op == 'delete':
+                    self.conn.execute(f"DELETE FROM {record['key']} WHERE id = ?", (record['id'],))
+                elif op == 'set' and record['key'] == 'reviews':
+                    self.conn.execute("DELETE FROM reviews")
+                    self._put_reviews(record['value'])
+                elif op == 'set':
+                    self._set_meta(record['key'], record['value'])
+                elif op == 'put':
+                    self._put_reviews({record['id']: record['value']})
+                elif op == 'timetable':
+                    self._insert('timetable', dict(record['value'], day=record['day']))
+                elif op == 'timetable_remove':
+                    self.conn.execute(
+                        "DELETE FROM timetable WHERE row_id IN "
+                        "(SELECT row_id FROM timetable WHERE day = ? AND time = ? AND assignment IS ? "
+                        "ORDER BY row_id LIMIT 1)",
+                        (record['day'], record['time'], record.get('assignment'))
+                    )
+
+    def _rebase(self, records):
+        """Fix up records for rows another connection added, see rebase_records()"""
+        data = {key: dict.fromkeys(row[0] for row in self.conn.execute(f"SELECT id FROM {key}"))
+                for key in KEYED_COLLECTIONS}
+        for row in self.conn.execute("SELECT key, value FROM meta WHERE key IN ('next_ids', 'total_study_hours')"):
+            data[row['key']] = json.loads(row['value'])
+        rebase_records(data, records)
+        self.data_version = self._data_version()
+
+    @instrumented
+    def vacuum(self):
+        """Give the pages of deleted rows back to the file system"""
+        self.conn.execute("VACUUM")
+
+    @instrumented
+    def query(self, table, subject, status, date_field, start, end, sort_by, descending,
+              limit, offset):
+        """One filtered, sorted page of a table and the total number of matches"""
+        columns = [name for name, _ in TABLES[table]]
+        if sort_by not in columns:
+            raise ValueError(f"Cannot sort {table} by {sort_by}")
+        where, params = [], []
+        if subject is not None:
+            where.append("subject = ?")
+            params.append(subject)
+        if status is not None:
+            if table == 'works':
+                where.append("completed = ?")
+                params.append(int(status == 'Completed'))
+            else:
+                where.append("status = ?")
+                params.append(status)
+        if start is not None:
+            where.append(f"{date_field} >= ?")
+            params.append(start)
+        if end is not None:
+            where.append(f"{date_field} <= ?")
+            params.append(end)
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        total = self.conn.execute(f"SELECT COUNT(*) FROM {table}{clause}", params).fetchone()[0]
+        tiebreak = 'row_id' if 'row_id' in columns else 'id'
+        rows = self.conn.execute(
+            f"SELECT * FROM {table}{clause} "
+            f"ORDER BY {sort_by} IS NULL, {sort_by} {'DESC' if descending else 'ASC'}, {tiebreak} "
+            f"LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        return [self._from_row(table, row) for row in rows], total
+
+    @instrumented
+    def aggregates(self):
+        """Seed the assistant's running aggregates with SQL aggregations"""
+        agg = {
+            'assignment_status': Counter({
+                row['status']: row['n'] for row in self.conn.execute(
+                    "SELECT status, COUNT(*) AS n FROM assignments GROUP BY status"
+                )
+            }),
+        }
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(CASE WHEN status = 'Completed' THEN COALESCE(score, 0) END), 0) AS completed_sum, "
+            "COALESCE(SUM(NULLIF(score, 0)), 0) AS score_sum, "
+            "COUNT(NULLIF(score, 0)) AS score_count "
+            "FROM assignments"
+        ).fetchone()
+        agg['completed_score_sum'] = row['completed_sum']
+        agg['score_sum'] = row['score_sum']
+        agg['score_count'] = row['score_count']
+        agg['works_completed'] = self.conn.execute(
+            "SELECT COUNT(*) FROM works WHERE completed"
+        ).fetchone()[0]
+        agg['session_buckets'] = [
+            tuple(row) for row in self.conn.execute(
+                "SELECT date, subject, SUM(duration_hours), COUNT(*) FROM study_log "
+                "GROUP BY date, subject"
+            )
+        ]
+        return agg
+
+
+class DeferredStorage:
+    """Buffers the commits of another backend and persists them together on flush().
+
+    Only load, save, commit and the locked()/stale() pair are passed through,
+    so callers use their in-memory paths instead of querying a backend that
+    may be behind.
+    """
+
+    merged = False
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.pending = []
+        self.snapshot = None
+
+    def load(self):
+        self.pending = []
+        return self.storage.load()
+
+    def save(self, data):
+        self.pending = []
+        self.storage.save(data)
+
+    def commit(self, records, snapshot):
+        self.pending.extend(records)
+        self.snapshot = snapshot
+
+    def locked(self):
+        return self.storage.locked()
+
+    def stale(self):
+        return self.storage.stale()
+
+    @instrumented
+    def flush(self):
+        """Write everything committed since the last flush as one commit; returns the record count"""
+        if not self.pending:
+            return 0
+        # Cleared only once written, so a failed flush is retried by the next one
+        records = self.pending
+        self.storage.commit(records, self.snapshot)
+        self.pending = []
+        if self.storage.merged:
+            self.storage.merged = False
+            self.merged = True
+        METRICS.observe('coalesced_records', 'DeferredStorage.flush', len(records))
+        return len(records)
+
+
+def create_storage(storage_mode, data_file):
+    """Build the storage backend for a mode: json, journal or sqlite"""
+    if storage_mode == "json":
+        return JSONStorage(data_file)
+    if storage_mode == "journal":
+        return JournalStorage(data_file)
+    if storage_mode == "sqlite":
+        return SQLiteStorage(os.path.splitext(data_file)[0] + '.db')
+    raise ValueError(f"Unknown storage mode: {storage_mode}")
+
+
+def load_read_only(storage_mode, data_file):
+    """Load a student's data without taking locks or writing anything, for reports over
+    files other processes may be using: JSON files and snapshots are replaced
+    atomically, a torn journal tail is skipped but left in place, and SQLite is
+    opened read-only"""
+    if storage_mode == "json":
+        return read_json(data_file)
+    if storage_mode == "journal":
+        data = JournalStorage(data_file)._read(repair=False)
+        for key in KEYED_COLLECTIONS:
+            data[key] = list(data[key].values())
+        return data
+    if storage_mode == "sqlite":
+        storage = SQLiteStorage(os.path.splitext(data_file)[0] + '.db', read_only=True)
+        try:
+            return storage.load()
+        finally:
+            storage.conn.close()
+    raise ValueError(f"Unknown storage mode: {storage_mode}")
+
+
+def migrate_json_to_sqlite(json_file="student_data.json", db_file="student_data.db"):
+    """One-shot copy of an existing JSON data file into a SQLite database"""
+    data = read_json(json_file)
+    SQLiteStorage(db_file).save(data)
+    return f"Migrated {json_file} to {db_file}"
+
+
+if __name__ == "__main__":
+    print(migrate_json_to_sqlite(*sys.argv[1:3]))
@@ -0,0 +1,182 @@
+"""Rule registry behind SmartLearningAssistant.get_ai_suggestions.
+
+A rule turns a few named inputs (pending count, score stats, streak, ...)
+into suggestion strings. Every input declares what it is derived from:
+the storage keys the assistant commits changes under ('assignments',
+'study_log', 'total_study_hours', ...) and 'day' for anything relative
+to today. Input values and rule results are cached until one of those
+sources changes, so asking again is a few counter lookups per rule.
+
+New rules are plain functions registered with @suggestion_rule; they run
+in registration order and should only read inputs, not scan records.
+"""
+from datetime import date
+
+# input name -> (sources, function of the assistant)
+INPUTS = {}
+
+# (rule, input names, sources of those inputs), in display order
+RULES = []
+
+
+def suggestion_input(*sources):
+    """Register a derived value that only changes with the given sources"""
+    def register(func):
+        INPUTS[func.__name__] = (sources, func)
+        return func
+    return register
+
+
+def suggestion_rule(*inputs):
+    """Register a rule called with the values of the given inputs; it returns a list of suggestions"""
+    def register(func):
+        sources = tuple(sorted({source for name in inputs for source in INPUTS[name][0]}))
+        RULES.append((func, inputs, sources))
+        return func
+    return register
+
+
+def _due_text(days_left):
+    if days_left < 0:
+        return f"{-days_left} day(s) overdue"
+    if days_left == 0:
+        return "due today"
+    if days_left == 1:
+        return "due tomorrow"
+    return f"due in {days_left} days"
+
+
+@suggestion_input('total_study_hours')
+def study_hours(assistant):
+    return assistant.total_study_hours
+
+
+@suggestion_input('assignments')
+def pending(assistant):
+    return assistant.aggregates['assignment_status']['Pending']
+
+
+@suggestion_input('assignments')
+def score_stats(assistant):
+    """(completed assignments, sum of their scores)"""
+    agg = assistant.aggregates
+    return agg['assignment_status']['Completed'], agg['completed_score_sum']
+
+
+@suggestion_input('assignments', 'projects', 'day')
+def overdue(assistant):
+    return assistant.deadlines.count_overdue(date.today().toordinal())
+
+
+@suggestion_input('assignments', 'projects', 'day')
+def most_urgent(assistant):
+    return assistant.get_urgent_work(1)
+
+
+@suggestion_input('reviews', 'day')
+def due_reviews(assistant):
+    return assistant.get_due_reviews(3)
+
+
+@suggestion_input('study_log', 'day')
+def streak(assistant):
+    return assistant.get_current_streak()
+
+
+@suggestion_input('study_log', 'day')
+def least_studied(assistant):
+    return assistant.get_least_studied_subject()
+
+
+@suggestion_rule('study_hours')
+def study_more(hours):
+    if hours < 10:
+        return ["💡 Increase daily study sessions to at least 2 hours"]
+    return []
+
+
+@suggestion_rule('pending')
+def prioritize_pending(count):
+    if count:
+        return [f"⚠️  You have {count} pending assignments. Prioritize them!"]
+    return []
+
+
+@suggestion_rule('overdue', 'most_urgent')
+def deadlines(count, urgent):
+    """Overdue work, then the single most urgent item"""
+    suggestions = []
+    if count:
+        suggestions.append(f"⏰ {count} item(s) are past their deadline. Finish or reschedule them")
+    if urgent:
+        item = urgent[0]
+        suggestions.append(f"🎯 Most urgent: '{item['title']}' ({_due_text(item['days_left'])})")
+    return suggestions
+
+
+@suggestion_rule('due_reviews')
+def review_topics(items):
+    if items:
+        return [f"🔁 Review due today: {', '.join(item['topic'] for item in items)}"]
+    return []
+
+
+@suggestion_rule('score_stats')
+def performance(stats):
+    completed, score_sum = stats
+    if completed:
+        avg_score = score_sum / completed
+        if avg_score < 70:
+            return ["📚 Your average score is below 70%. Focus on difficult topics"]
+        if avg_score > 85:
+            return ["⭐ Excellent performance! Keep it up!"]
+    return []
+
+
+@suggestion_rule('streak')
+def streak_motivation(days):
+    if days >= 7:
+        return [f"🔥 Amazing streak of {days} days! You're on fire!"]
+    if days == 0:
+        return ["🚀 Start your learning journey today!"]
+    return []
+
+
+@suggestion_rule('least_studied')
+def subject_balance(subject):
+    if subject is not None:
+        return [f"📖 Spend more time on {subject}"]
+    return []
+
+
+class SuggestionEngine:
+    """Cached inputs and rule results of one assistant"""
+
+    def __init__(self, assistant):
+        self.assistant = assistant
+        self.values = {}  # input name -> (stamp, value)
+        self.results = {}  # rule -> (stamp, suggestions)
+
+    def _stamp(self, sources, today):
+        changes = self.assistant.changes
+        return tuple(today if source == 'day' else changes[source] for source in sources)
+
+    def _input(self, name, today):
+        sources, func = INPUTS[name]
+        stamp = self._stamp(sources, today)
+        cached = self.values.get(name)
+        if cached is None or cached[0] != stamp:
+            cached = self.values[name] = (stamp, func(self.assistant))
+        return cached[1]
+
+    def evaluate(self):
+        """Suggestions of every rule, re-running only rules whose sources changed"""
+        today = date.today().toordinal()
+        suggestions = []
+        for rule, inputs, sources in RULES:
+            stamp = self._stamp(sources, today)
+            cached = self.results.get(rule)
+            if cached is None or cached[0] != stamp:
+                cached = self.results[rule] = (stamp, rule(*(self._input(name, today) for name in inputs)))
+            suggestions.extend(cached[1])
+        return suggestions
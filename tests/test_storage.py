@@ -0,0 +1,74 @@
+"""Regression tests for the storage backends: journal repair, and two assistants
+(standing in for two processes) writing the same data file"""
+import pytest
+
+from backend import SmartLearningAssistant
+from storage import JournalStorage, empty_data
+
+MODES = ['json', 'journal', 'sqlite']
+
+
+def open_assistant(tmp_path, mode, name='A', **kwargs):
+    return SmartLearningAssistant(name, mode, str(tmp_path / 'student.json'), **kwargs)
+
+
+def test_torn_journal_tail_is_cut_off(tmp_path):
+    storage = JournalStorage(str(tmp_path / 'student.json'))
+    storage.save(empty_data())
+    storage.commit([{'op': 'append', 'key': 'study_log', 'value': {'n': 1}}], None)
+    with open(storage.journal_file, 'a') as f:
+        f.write('{"op":"app')  # a crash in the middle of an append
+
+    storage = JournalStorage(storage.data_file)
+    assert storage.load()['study_log'] == [{'n': 1}]
+    # Without the repair this record would be glued onto the torn line and lost
+    storage.commit([{'op': 'append', 'key': 'study_log', 'value': {'n': 2}}], None)
+    assert JournalStorage(storage.data_file).load()['study_log'] == [{'n': 1}, {'n': 2}]
+
+
+@pytest.mark.parametrize('defer', [False, True])
+@pytest.mark.parametrize('mode', MODES)
+def test_writers_sharing_a_file_keep_each_others_records(tmp_path, mode, defer):
+    a = open_assistant(tmp_path, mode, 'A', defer_writes=defer)
+    b = open_assistant(tmp_path, mode, 'B', defer_writes=defer)
+    a.add_work('Worksheet', 'Math', 1.0)
+    a.log_study_session('Math', 1.0, 'algebra')
+    b.add_work('Lab report', 'Biology', 2.0)
+    b.log_study_session('Biology', 2.0, 'cells')
+    a.flush()
+    b.flush()
+
+    fresh = open_assistant(tmp_path, mode, 'C')
+    assert sorted(work.title for work in fresh.works.values()) == ['Lab report', 'Worksheet']
+    assert sorted(fresh.works) == [1, 2]
+    assert len(fresh.study_log) == 2
+    assert fresh.total_study_hours == 3.0
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_archive_keeps_records_written_since_load(tmp_path, mode):
+    a = open_assistant(tmp_path, mode, 'A')
+    a.import_study_sessions([{'date': '2020-01-01', 'subject': 'Math', 'duration_hours': 1, 'topics': 'sets'}])
+    b = open_assistant(tmp_path, mode, 'B')
+    b.add_assignment('Essay', 'English', 7)
+
+    assert a.archive_sessions(90).startswith("Archived 1 sessions")
+    fresh = open_assistant(tmp_path, mode, 'C')
+    assert [assignment.title for assignment in fresh.assignments.values()] == ['Essay']
+    assert fresh.archived == 1 and fresh.study_log == []
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_rebased_append_never_reuses_a_deleted_id(tmp_path, mode):
+    a = open_assistant(tmp_path, mode, 'A')
+    b = open_assistant(tmp_path, mode, 'B')
+    a.add_assignment('Quiz', 'Math', 3)
+    a.delete_record('assignments', 1)
+    # B still thinks id 1 is free; its append must move past the deleted one
+    b.add_assignment('Essay', 'English', 7)
+    assert list(b.assignments) == [2]
+    b.update_record('assignments', 2, title='Long essay')
+
+    fresh = open_assistant(tmp_path, mode, 'C')
+    assert [(assignment.id, assignment.title) for assignment in fresh.assignments.values()] == [(2, 'Long essay')]
+    assert fresh.next_ids['assignments'] == 3
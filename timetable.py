@@ -0,0 +1,212 @@
+"""Weekly timetable as sorted intervals per day.
+
+Each day's entries ({'time': "HH:MM", 'subject', 'duration' hours}) are
+kept sorted by start, next to parallel lists of start and end minutes
+and of the latest end so far (entries added with allow_overlap can reach
+past their neighbours). An overlap check is then a binary search plus a
+walk back over the entries still running, and free slots are the gaps
+between consecutive entries.
+"""
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_MINUTES = 24 * 60
+
+# Part of the day free slots and auto-scheduling are looked for in
+STUDY_START = 8 * 60
+STUDY_END = 22 * 60
+
+
+def parse_time(text):
+    """"HH:MM" -> minutes after midnight"""
+    hours, _, minutes = text.partition(':')
+    if not (hours.isdigit() and minutes.isdigit() and len(minutes) == 2):
+        raise ValueError(f"Invalid time: {text!r}")
+    minute = int(hours) * 60 + int(minutes)
+    if int(minutes) >= 60 or minute >= DAY_MINUTES:
+        raise ValueError(f"Invalid time: {text!r}")
+    return minute
+
+
+def time_text(minute):
+    return '%02d:%02d' % divmod(minute, 60)
+
+
+def entry_span(entry):
+    """(start, end) minutes of a timetable entry"""
+    start = parse_time(entry['time'])
+    return start, start + round(float(entry['duration']) * 60)
+
+
+class DayPlan:
+    """One day's entries sorted by start time"""
+
+    def __init__(self, entries=()):
+        spans = sorted(((entry_span(entry), entry) for entry in entries), key=lambda item: item[0])
+        self.entries = [entry for _, entry in spans]
+        self.starts = [start for (start, _), _ in spans]
+        self.ends = [end for (_, end), _ in spans]
+        # reach[i] is the latest end among entries 0..i
+        self.reach = []
+        self._update_reach(0)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _update_reach(self, i):
+        """Recompute reach from index i on, after an insert or delete there"""
+        reach = self.reach[i - 1] if i else -1
+        del self.reach[i:]
+        for end in self.ends[i:]:
+            reach = max(reach, end)
+            self.reach.append(reach)
+
+    def conflict(self, start, end):
+        """An entry overlapping start..end, or None"""
+        i = bisect_right(self.starts, start)
+        # Walk back while some earlier entry is still running at start
+        j = i
+        while j and self.reach[j - 1] > start:
+            if self.ends[j - 1] > start:
+                return self.entries[j - 1]
+            j -= 1
+        if i < len(self.starts) and self.starts[i] < end:
+            return self.entries[i]
+        return None
+
+    def add(self, entry):
+        start, end = entry_span(entry)
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.entries.insert(i, entry)
+        self._update_reach(i)
+
+    def remove(self, start, entry=None):
+        """Remove and return the (first) entry starting at a minute, or that entry, or None"""
+        i = bisect_left(self.starts, start)
+        while entry is not None and i < len(self.starts) and self.starts[i] == start and self.entries[i] is not entry:
+            i += 1
+        if i == len(self.starts) or self.starts[i] != start:
+            return None
+        del self.starts[i], self.ends[i]
+        self._update_reach(i)
+        return self.entries.pop(i)
+
+    def at(self, minute):
+        """Index of the first entry that has not ended by a minute"""
+        i = bisect_right(self.starts, minute)
+        while i and self.reach[i - 1] > minute:
+            i -= 1
+        while i < len(self.starts) and self.starts[i] <= minute and self.ends[i] <= minute:
+            i += 1
+        return i
+
+    def gaps(self, start=STUDY_START, end=STUDY_END):
+        """Free (start, end) minute ranges between start and end"""
+        gaps, cursor = [], start
+        for i in range(self.at(start), len(self.starts)):
+            if self.starts[i] >= end:
+                break
+            if self.starts[i] > cursor:
+                gaps.append((cursor, self.starts[i]))
+            cursor = max(cursor, self.ends[i])
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+
+class Timetable:
+    """Day name -> DayPlan, with the weekly minutes per subject"""
+
+    def __init__(self, timetable):
+        # The sorted entry lists are shared with the plain {day: [entry]} dict
+        self.timetable = timetable
+        self.days = {}
+        self.load = Counter()
+        for day, entries in timetable.items():
+            plan = self.days[day] = DayPlan(entries)
+            timetable[day] = plan.entries
+            for start, end, entry in zip(plan.starts, plan.ends, plan.entries):
+                self.load[entry['subject']] += end - start
+
+    def plan(self, day):
+        plan = self.days.get(day)
+        if plan is None:
+            plan = self.days[day] = DayPlan()
+            self.timetable[day] = plan.entries
+        return plan
+
+    def add(self, day, entry):
+        start, end = entry_span(entry)
+        self.plan(day).add(entry)
+        self.load[entry['subject']] += end - start
+
+    def remove(self, day, start, entry=None):
+        plan = self.days.get(day)
+        entry = plan.remove(start, entry) if plan is not None else None
+        if entry is not None:
+            self.load[entry['subject']] -= entry_span(entry)[1] - start
+            if not self.load[entry['subject']]:
+                del self.load[entry['subject']]
+            if not plan:
+                del self.days[day], self.timetable[day]
+        return entry
+
+    def conflicts(self):
+        """(day, entry, entry) pairs that overlap, e.g. from files written before overlaps were rejected"""
+        found = []
+        for day, plan in self.days.items():
+            reach, last = -1, None
+            for start, end, entry in zip(plan.starts, plan.ends, plan.entries):
+                if start < reach:
+                    found.append((day, last, entry))
+                if end > reach:
+                    reach, last = end, entry
+        return found
+
+    def upcoming(self, weekday, minute):
+        """(days ahead, entry, start, end) of the entry in progress or starting next,
+        from a weekday index (Monday is 0) and minute, or None for an empty week"""
+        for ahead in range(len(DAYS) + 1):
+            plan = self.days.get(DAYS[(weekday + ahead) % len(DAYS)])
+            if not plan:
+                continue
+            # Today only from the current minute on; a week ahead wraps around to today's first entry
+            i = plan.at(minute) if ahead == 0 else 0
+            if i < len(plan):
+                return ahead, plan.entries[i], plan.starts[i], plan.ends[i]
+        return None
+
+    def schedule(self, tasks, weekday, minute, days=len(DAYS)):
+        """Place tasks into the earliest free study slots of the coming days.
+
+        tasks are (minutes needed, last day offset, key) in the order they
+        should get slots (e.g. earliest deadline first); a task is only put
+        on days up to its last day offset (at least today). Returns
+        (key, day offset, start, end) placements and the keys that did not fit.
+        """
+        free = []
+        for ahead in range(days):
+            plan = self.days.get(DAYS[(weekday + ahead) % len(DAYS)]) or DayPlan()
+            start = max(STUDY_START, minute) if ahead == 0 else STUDY_START
+            free.append([list(gap) for gap in plan.gaps(start, STUDY_END) if gap[1] > gap[0]])
+        longest = [max((end - start for start, end in gaps), default=0) for gaps in free]
+        placed, unplaced = [], []
+        for need, last, key in tasks:
+            if need > max(longest, default=0):
+                unplaced.append(key)
+                continue
+            for ahead in range(min(max(last, 0), days - 1) + 1):
+                if longest[ahead] < need:
+                    continue
+                gaps = free[ahead]
+                gap = next(gap for gap in gaps if gap[1] - gap[0] >= need)
+                placed.append((key, ahead, gap[0], gap[0] + need))
+                gap[0] += need
+                longest[ahead] = max((end - start for start, end in gaps), default=0)
+                break
+            else:
+                unplaced.append(key)
+        return placed, unplaced
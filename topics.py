@@ -0,0 +1,133 @@
+"""Inverted index over the topics of logged study sessions.
+
+A session's id is its position in the assistant's study log (the log is
+append-only, and archived sessions keep their positions, see archive.py).
+Topics are normalized like review items (see reviews.py) and split into
+word tokens; each token maps to a compact array of the ids of the
+sessions that mention it. Tokens are also kept sorted, so a prefix is a
+binary search and a multi-term query intersects a few posting lists.
+Per-topic counts, hours and first/last study days are kept alongside,
+overall and per subject id.
+"""
+from array import array
+from bisect import bisect_left, insort
+from functools import lru_cache
+import re
+
+from reviews import parse_topics
+
+
+@lru_cache(maxsize=4096)
+def tokenize(text):
+    """Lowercased word tokens of a topic or search query"""
+    return tuple(dict.fromkeys(re.findall(r'\w+', text.lower())))
+
+
+def _count(stats, topic, sessions, hours, first, last):
+    """Add sessions to the [sessions, hours, first day, last day] of a topic"""
+    entry = stats.get(topic)
+    if entry is None:
+        stats[topic] = [sessions, hours, first, last]
+    else:
+        entry[0] += sessions
+        entry[1] += hours
+        if first < entry[2]:
+            entry[2] = first
+        if last > entry[3]:
+            entry[3] = last
+
+
+class TopicIndex:
+    """Token -> session id postings plus topic statistics"""
+
+    def __init__(self):
+        self.postings = {}
+        self.tokens = []  # sorted, for prefix search
+        self.stats = {}  # topic -> [sessions, hours, first day, last day]
+        self.subject_stats = {}  # subject id -> topic -> same
+
+    def add(self, session_id, session):
+        self.add_many((session,), session_id)
+
+    def add_stats(self, subject, topic, sessions, hours, first, last):
+        """Count sessions that are no longer indexed (e.g. archived ones) in the topic statistics"""
+        _count(self.stats, topic, sessions, hours, first, last)
+        _count(self.subject_stats.setdefault(subject, {}), topic, sessions, hours, first, last)
+
+    def add_many(self, sessions, start=0):
+        """Index sessions numbered from start on; ids must only grow.
+
+        Histories repeat the same topics a lot, so sessions are grouped by
+        (subject, topics text) first and every group is indexed once.
+        """
+        groups = {}
+        for session_id, session in enumerate(sessions, start):
+            group = groups.get((session.subject, session.topics))
+            if group is None:
+                groups[session.subject, session.topics] = [[session_id], session.hours,
+                                                            session.day, session.day]
+            else:
+                group[0].append(session_id)
+                group[1] += session.hours
+                if session.day < group[2]:
+                    group[2] = session.day
+                elif session.day > group[3]:
+                    group[3] = session.day
+        postings, touched, new_tokens = self.postings, {}, []
+        for (subject, text), (ids, hours, first, last) in groups.items():
+            topics = parse_topics(text)
+            if not topics:
+                continue
+            subject_stats = self.subject_stats.setdefault(subject, {})
+            tokens = set()
+            for topic in topics:
+                _count(self.stats, topic, len(ids), hours, first, last)
+                _count(subject_stats, topic, len(ids), hours, first, last)
+                tokens.update(tokenize(topic))
+            for token in tokens:
+                if token not in postings:
+                    postings[token] = array('l')
+                    new_tokens.append(token)
+                postings[token].extend(ids)
+                touched[token] = touched.get(token, 0) + 1
+        # Several groups extend a posting list out of order; restore id order
+        for token, count in touched.items():
+            if count > 1:
+                postings[token] = array('l', sorted(postings[token]))
+        if len(new_tokens) > 16:
+            self.tokens = sorted(self.tokens + new_tokens)
+        else:
+            for token in new_tokens:
+                insort(self.tokens, token)
+
+    def prefix(self, text):
+        """Indexed tokens starting with text"""
+        start = bisect_left(self.tokens, text)
+        end = start
+        while end < len(self.tokens) and self.tokens[end].startswith(text):
+            end += 1
+        return self.tokens[start:end]
+
+    def search(self, query):
+        """Ids of sessions matching every query term (each term as a word prefix), newest first"""
+        matches = []
+        for term in tokenize(query):
+            tokens = self.prefix(term)
+            if not tokens:
+                return []
+            if len(tokens) == 1:
+                matches.append(self.postings[tokens[0]])
+            else:
+                ids = set()
+                for token in tokens:
+                    ids.update(self.postings[token])
+                matches.append(ids)
+        if not matches:
+            return []
+        matches.sort(key=len)
+        found = set(matches[0])
+        for ids in matches[1:]:
+            found.intersection_update(ids)
+            if not found:
+                break
+        return sorted(found, reverse=True)